@@ -1,15 +1,20 @@
 from .frontend.lexer import tokenize
 from .frontend.parser import Parser
+from .frontend.optimizer import optimize
 import flu.runtime.interpreter as interpreter
 from .runtime.values import Environment, NativeFunction, Return, Stop
 from .errors import ReturnError, StopError
 import sys
 import flu.runtime.builtin_functions
+import flu.runtime.output as output
 
-def execute_code(code, extension):
+def execute_code(code, extension, explicit_stack=False):
+    # explicit_stack runs the program on the interpreter's own frame stack, so deep
+    # recursion is limited by interpreter.MAX_RECURSION_DEPTH rather than by Python
     try:
         interpreter.FILE_EXTENSION = extension
-        global_environment = Environment(extension=interpreter.FILE_EXTENSION)
+        # builtins live one level up, so a script can still name its own variables sum, row, ...
+        global_environment = Environment(extension=interpreter.FILE_EXTENSION).copy()
 
         rt = tokenize(code, extension)
         if rt.error:
@@ -24,7 +29,7 @@ def execute_code(code, extension):
         
         #print(f"Tree: {rt.result}\n")
 
-        rt = interpreter.evaluate(rt.result, global_environment, False, False, False)
+        rt = interpreter.run(optimize(rt.result), global_environment, explicit_stack=explicit_stack)
         if rt.error:
             rt.error.show_error()
         
@@ -34,15 +39,19 @@ def execute_code(code, extension):
             error = ReturnError("Cannot return outside of function", 99) # unexpected
             error.show_error()
         
-        if isinstance(rt.Result, Stop):
+        if isinstance(rt.result, Stop):
             error = StopError("Cannot break outside of loop", 99) # unexpected
             error.show_error()
     except KeyboardInterrupt:
+        output.flush()
         sys.stdout.write("\n[INFO] Process force quitted")
+    finally:
+        # everything shown goes out before execute_code returns, also when it stops on an error
+        output.flush()
 
-def execute_cmd():
+def execute_cmd(explicit_stack=False):
     interpreter.FILE_EXTENSION = "fl"
-    global_environment = Environment(extension=interpreter.FILE_EXTENSION)
+    global_environment = Environment(extension=interpreter.FILE_EXTENSION).copy()
 
     sys.stdout.write("flu >> ")
     sys.stdout.flush()
@@ -64,7 +73,7 @@ def execute_cmd():
             
             #print(f"Tree: {rt.result}\n")
 
-            rt = interpreter.evaluate(rt.result, global_environment)
+            rt = interpreter.run(optimize(rt.result), global_environment, explicit_stack=explicit_stack)
             if rt.error:
                 rt.error.show_error()
             
@@ -74,8 +83,10 @@ def execute_cmd():
                 error = ReturnError("Cannot return outside of function", 99) # unexpected
                 error.show_error()
             
+            output.flush()
             sys.stdout.write("flu >> ")
             sys.stdout.flush()
         except KeyboardInterrupt:
+            output.flush()
             sys.stdout.write("\n[INFO] Forced exiting terminal...")
             sys.exit()
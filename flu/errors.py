@@ -16,6 +16,9 @@ class Error:
         self.reason = reason
     
     def show_error(self):
+        # whatever the program showed before the error comes out first
+        import flu.runtime.output as output
+        output.flush()
         print(f"{self.error.type}#{self.error_code}: {self.reason}\nLearn more at https://docs.fluentix.dev/error/{self.error.type}{self.error_code}")
         sys.exit(self.error_code)
 
@@ -57,4 +60,8 @@ class ReturnError(Error):
 
 class StopError(Error):
     def __init__(self, reason, error_code):
-        super().__init__(ErrorType("StopError"), reason, error_code)
\ No newline at end of file
+        super().__init__(ErrorType("StopError"), reason, error_code)
+
+class RecursionError(Error):
+    def __init__(self, reason, error_code):
+        super().__init__(ErrorType("RecursionError"), reason, error_code)
\ No newline at end of file
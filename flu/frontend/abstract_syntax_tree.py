@@ -50,6 +50,16 @@ class CallExpression(Expression):
     def __repr__(self):
         return f"(FUNCTION CALL {self.callee} with arguments [{'; '.join([argument.__repr__() for argument in self.arguments])}])"
 
+class UncheckedIndexExpression(Expression):
+    # array indexing the optimizer proved to be in bounds
+    def __init__(self, array, index):
+        super().__init__(NodeType("UncheckedIndexExpression"))
+        self.array = array
+        self.index = index
+    
+    def __repr__(self):
+        return f"(UNCHECKED INDEX {self.array} at {self.index})"
+
 class UnaryExpression(Expression):
     def __init__(self, sign, value):
         super().__init__(NodeType("UnaryExpression"))
@@ -114,6 +124,45 @@ class ArrayLiteral(Expression):
     def __repr__(self):
         return f"(ARRAY LITERAL [{'; '.join([element.__repr__() for element in self.value])}])"
 
+class SliceExpression(Expression):
+    def __init__(self, array, start, end):
+        super().__init__(NodeType("SliceExpression"))
+        self.array = array
+        self.start = start
+        self.end = end
+    
+    def __repr__(self):
+        return f"(SLICE EXPRESSION {self.array.__repr__()}: {self.start.__repr__()} to {self.end.__repr__()})"
+
+class FieldExpression(Expression):
+    def __init__(self, field, record):
+        super().__init__(NodeType("FieldExpression"))
+        self.field = field
+        self.record = record
+        # the record type last read here and where the field sits in it
+        self.cached_type = None
+        self.cached_slot = None
+    
+    def __repr__(self):
+        return f"(FIELD EXPRESSION {self.field} of {self.record.__repr__()})"
+
+class DictionaryLiteral(Expression):
+    def __init__(self, keys, values):
+        super().__init__(NodeType("DictionaryLiteral"))
+        self.keys = keys
+        self.values = values
+    
+    def __repr__(self):
+        return f"(DICTIONARY LITERAL {{{'; '.join([f'{key.__repr__()}: {value.__repr__()}' for key, value in zip(self.keys, self.values)])}}})"
+
+class SetLiteral(Expression):
+    def __init__(self, value):
+        super().__init__(NodeType("SetLiteral"))
+        self.value = value
+    
+    def __repr__(self):
+        return f"(SET LITERAL {{{'; '.join([element.__repr__() for element in self.value])}}})"
+
 class AssignmentStatement(Statement):
     def __init__(self, identifier, value, constant=False):
         super().__init__(NodeType("AssignmentStatement"))
@@ -137,6 +186,8 @@ class GetStatement(Statement):
     def __init__(self, module):
         super().__init__(NodeType("GetStatement"))
         self.module = module
+        # the name the module is bound to, python.os.path is bound to path
+        self.name = module.rsplit(".", 1)[-1] if module.startswith("python.") else module
     
     def __repr__(self):
         return f"(GET STATEMENT {self.module})"
@@ -151,16 +202,39 @@ class IfUnlessElseStatement(Statement):
     def __repr__(self):
         return f"(IF UNLESS ELSE STATEMENT {self.condition})"
 
+class JumpTableStatement(Statement):
+    # an if/elif chain comparing one variable against constants, lowered by the optimizer
+    def __init__(self, subject, table, arms, default=None):
+        super().__init__(NodeType("JumpTableStatement"))
+        self.subject = subject
+        self.table = table
+        self.arms = arms
+        self.default = default
+    
+    def __repr__(self):
+        return f"(JUMP TABLE STATEMENT on {self.subject} with {len(self.arms)} arms)"
+
 class FunctionDeclarationStatement(Statement):
-    def __init__(self, func_name, arguments, body):
+    def __init__(self, func_name, arguments, body, memoise=True):
         super().__init__(NodeType("FunctionDeclarationStatement"))
         self.func_name = func_name
         self.arguments = arguments
         self.body = body
+        self.memoise = memoise
+        self.pure = False # set by the optimizer
     
     def __repr__(self):
         return f"(FUNCTION DECLARATION STATEMENT {self.func_name} with arguments {self.arguments})"
 
+class RecordDeclarationStatement(Statement):
+    def __init__(self, name, fields):
+        super().__init__(NodeType("RecordDeclarationStatement"))
+        self.name = name
+        self.fields = fields
+    
+    def __repr__(self):
+        return f"(RECORD DECLARATION STATEMENT {self.name} with fields {self.fields})"
+
 class ReturnStatement(Statement):
     def __init__(self, value):
         super().__init__(NodeType("ReturnStatement"))
@@ -169,15 +243,50 @@ class ReturnStatement(Statement):
     def __repr__(self):
         return f"(RETURN STATEMENT {self.value})"
 
+class IndexGuard:
+    def __init__(self, index, start, bound, arrays, plain_arrays, written):
+        self.index = index
+        self.start = start
+        self.bound = bound
+        self.arrays = arrays
+        self.plain_arrays = plain_arrays
+        # arrays the loop writes at the index, these cannot be bytes
+        self.written = written
+
 class UntilStatement(Statement):
     def __init__(self, condition, body):
         super().__init__(NodeType("UntilStatement"))
         self.condition = condition
         self.body = body
+        self.guard = None # set by the optimizer
+        self.unchecked_body = None
     
     def __repr__(self):
         return f"(UNTIL STATEMENT with condition {self.condition})"
     
+class ForStatement(Statement):
+    def __init__(self, identifier, start, end, body):
+        super().__init__(NodeType("ForStatement"))
+        self.identifier = identifier
+        self.start = start
+        self.end = end
+        self.body = body
+        self.guard = None # set by the optimizer
+        self.unchecked_body = None
+    
+    def __repr__(self):
+        return f"(FOR STATEMENT {self.identifier} from {self.start} to {self.end})"
+
+class ForEachStatement(Statement):
+    def __init__(self, identifier, iterable, body):
+        super().__init__(NodeType("ForEachStatement"))
+        self.identifier = identifier
+        self.iterable = iterable
+        self.body = body
+
+    def __repr__(self):
+        return f"(FOR EACH STATEMENT {self.identifier} in {self.iterable})"
+
 class StopStatement(Statement):
     def __init__(self):
         super().__init__(NodeType("StopStatement"))
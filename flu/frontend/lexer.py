@@ -34,17 +34,22 @@ def define_keywords(extension):
         "elif" : TokenType("Unless"),
         "else": TokenType("Else"),
         "define": TokenType("Define"),
+        "record": TokenType("Record"),
+        "uncached": TokenType("Uncached"),
         "with": TokenType("With"),
         "return": TokenType("Return"),
         "repeat": TokenType("Repeat"),
         "until": TokenType("Until"),
+        "for": TokenType("For"),
         "stop": TokenType("Stop"),
         "include": TokenType("Include"),
         "to": TokenType("To"),
         "exclude": TokenType("Exclude"),
         "from": TokenType("From"),
         "element": TokenType("Element"),
-        "at": TokenType("At")
+        "at": TokenType("At"),
+        "in": TokenType("In"),
+        "of": TokenType("Of")
     }
 
     if extension == "fl":
@@ -92,6 +97,10 @@ def tokenize(code, extension):
                 tokens += [Token(TokenType("OpenBracket"), src.pop(0))]
             case "]":
                 tokens += [Token(TokenType("CloseBracket"), src.pop(0))]
+            case "{":
+                tokens += [Token(TokenType("OpenBrace"), src.pop(0))]
+            case "}":
+                tokens += [Token(TokenType("CloseBrace"), src.pop(0))]
             case ":":
                 tokens += [Token(TokenType("Colon"), src.pop(0))]
             case ";":
@@ -190,7 +199,8 @@ def tokenize(code, extension):
                                 break
 
                             string += src.pop(0)
-                        
+                            continue
+
                         src.pop(0)
                     
                     if flag:
@@ -0,0 +1,406 @@
+from collections import Counter
+from copy import deepcopy
+from .abstract_syntax_tree import UncheckedIndexExpression, IndexGuard, JumpTableStatement, Identifier
+
+# builtins that never touch the outside world
+PURE_BUILTINS = {"tonumber", "tostring", "absolute", "sum", "product", "min", "max", "mean", "shape", "bytes", "decode", "length", "search", "indexof", "concat", "join"}
+PURE_MODULES = {"math", "strings"}
+# builtins that may do I/O but never change an array
+NON_MUTATING_BUILTINS = PURE_BUILTINS | {"show", "ask", "input", "stop", "readall", "readnumbers", "matrix", "transpose", "matmul", "row", "column", "loadmatrix", "set", "keys", "values", "persistent", "copy", "range", "lines", "readbytes", "writebytes"}
+# shortest if/elif chain worth turning into a jump table
+JUMP_TABLE_THRESHOLD = 4
+
+def children(node):
+    match node.kind.type:
+        case "Program":
+            return node.body
+        case "BinaryExpression" | "ComparisonExpression":
+            return [node.left, node.right]
+        case "CallExpression":
+            return [node.callee] + node.arguments
+        case "UnaryExpression":
+            return [node.value]
+        case "ArrayLiteral" | "SetLiteral":
+            return node.value
+        case "DictionaryLiteral":
+            return node.keys + node.values
+        case "SliceExpression":
+            return [node.array, node.start, node.end]
+        case "FieldExpression":
+            return [node.record]
+        case "AssignmentStatement":
+            return [node.value]
+        case "UpdateStatement":
+            return [node.identifier, node.value]
+        case "IfUnlessElseStatement":
+            return [node.condition, node.body] + ([node.next] if node.next else [])
+        case "JumpTableStatement":
+            return [node.subject] + node.arms + ([node.default] if node.default else [])
+        case "FunctionDeclarationStatement":
+            return [node.body]
+        case "ReturnStatement":
+            return [node.value]
+        case "UntilStatement":
+            return [node.condition, node.body]
+        case "ForStatement":
+            return [node.start, node.end, node.body]
+        case "ForEachStatement":
+            return [node.iterable, node.body]
+        case "ForeverStatement":
+            return [node.body]
+        case "IncludeStatement":
+            return [node.array, node.element] + ([node.index] if node.index else [])
+        case "ExcludeStatement":
+            return [node.array, node.index]
+
+    return []
+
+def walk(node):
+    yield node
+    for child in children(node):
+        yield from walk(child)
+
+def bound_names(node):
+    match node.kind.type:
+        case "AssignmentStatement":
+            return [node.identifier]
+        case "FunctionDeclarationStatement":
+            return [node.func_name] + node.arguments
+        case "GetStatement":
+            return [node.name]
+        case "RecordDeclarationStatement":
+            return [node.name]
+        case "ForStatement" | "ForEachStatement":
+            return [node.identifier]
+
+    return []
+
+def is_data_literal(node, scalar_only):
+    match node.kind.type:
+        case "NumberLiteral" | "StringLiteral" | "BooleanLiteral":
+            return True
+        case "UnaryExpression":
+            return is_data_literal(node.value, scalar_only)
+        case "BinaryExpression" | "ComparisonExpression":
+            return is_data_literal(node.left, scalar_only) and is_data_literal(node.right, scalar_only)
+        case "ArrayLiteral":
+            return not scalar_only and all(is_data_literal(element, False) for element in node.value)
+
+    return False
+
+class ProgramFacts:
+    def __init__(self, program):
+        self.bindings = Counter()
+        self.updated = set()
+        self.mutates_arrays = False
+        self.functions = {}
+        self.modules = {}
+        self.records = set()
+        self.globals = {}
+
+        for node in walk(program):
+            self.bindings.update(bound_names(node))
+            match node.kind.type:
+                case "UpdateStatement":
+                    if node.identifier.kind.type == "Identifier":
+                        self.updated.add(node.identifier.symbol)
+                    else:
+                        self.mutates_arrays = True
+                case "IncludeStatement" | "ExcludeStatement":
+                    self.mutates_arrays = True
+                case "FunctionDeclarationStatement":
+                    self.functions[node.func_name] = node
+                case "GetStatement":
+                    self.modules[node.name] = node
+                case "RecordDeclarationStatement":
+                    self.records.add(node.name)
+
+        for statement in program.body:
+            if statement.kind.type == "AssignmentStatement":
+                self.globals[statement.identifier] = statement.value
+
+    def bound_once(self, name):
+        return self.bindings[name] == 1
+
+    def is_stable_global(self, name):
+        # read-only global whose value cannot change between two calls
+        if name not in self.globals or not self.bound_once(name) or name in self.updated:
+            return False
+
+        return is_data_literal(self.globals[name], self.mutates_arrays)
+
+def local_names(function):
+    names = set(function.arguments)
+    for node in walk(function.body):
+        names.update(bound_names(node))
+
+    return names
+
+def function_dependencies(function, facts):
+    # returns the user functions this one calls, or None when it is impure
+    locals = local_names(function)
+    dependencies = set()
+    skipped = set()
+    for node in walk(function.body):
+        if id(node) in skipped:
+            continue
+
+        match node.kind.type:
+            case "IncludeStatement" | "ExcludeStatement" | "GetStatement" | "StopStatement":
+                return None
+            case "UpdateStatement":
+                if node.identifier.kind.type != "Identifier" or node.identifier.symbol not in locals:
+                    return None
+            case "CallExpression":
+                callee = node.callee
+                if callee.kind.type == "Identifier" and callee.symbol not in locals and callee.symbol in facts.modules:
+                    if node.arguments and node.arguments[0].kind.type in ("CallExpression", "Identifier"):
+                        inner = node.arguments[0]
+                        skipped.add(id(inner.callee) if inner.kind.type == "CallExpression" else id(inner))
+            case "Identifier":
+                name = node.symbol
+                if name in locals:
+                    continue
+
+                if name in facts.functions and facts.bound_once(name):
+                    dependencies.add(name)
+                elif name in PURE_BUILTINS and name not in facts.bindings:
+                    continue
+                elif name in facts.modules and facts.bound_once(name) and facts.modules[name].module in PURE_MODULES:
+                    continue
+                elif not facts.is_stable_global(name):
+                    return None
+
+    return dependencies
+
+def analyse_purity(program):
+    facts = ProgramFacts(program)
+    dependencies = {}
+    for name, function in facts.functions.items():
+        function.pure = False
+        if facts.bound_once(name):
+            dependencies[name] = function_dependencies(function, facts)
+
+    pure = {name for name, depends in dependencies.items() if depends is not None}
+    changed = True
+    while changed:
+        changed = False
+        for name in list(pure):
+            if not dependencies[name] <= pure:
+                pure.remove(name)
+                changed = True
+
+    for name in pure:
+        facts.functions[name].pure = True
+
+    return pure
+
+def counted_loop_shape(loop):
+    # matches `until i > N` (or >=) whose body ends in `i is now i + c`
+    condition = loop.condition
+    if condition.kind.type != "ComparisonExpression" or condition.operator not in ("GreaterThan", "GreaterThanOrEquals"):
+        return None
+
+    if condition.left.kind.type != "Identifier" or condition.right.kind.type not in ("Identifier", "NumberLiteral"):
+        return None
+
+    index = condition.left.symbol
+    if not loop.body.body:
+        return None
+
+    step = loop.body.body[-1]
+    if step.kind.type != "UpdateStatement" or step.identifier.kind.type != "Identifier" or step.identifier.symbol != index:
+        return None
+
+    value = step.value
+    if value.kind.type != "BinaryExpression" or value.operator != "Plus":
+        return None
+
+    operands = [value.left, value.right]
+    identifiers = [operand for operand in operands if operand.kind.type == "Identifier" and operand.symbol == index]
+    numbers = [operand for operand in operands if operand.kind.type == "NumberLiteral"]
+    if len(identifiers) != 1 or len(numbers) != 1 or numbers[0].value < 1 or numbers[0].value % 1 != 0:
+        return None
+
+    return index, Identifier(index), condition.right, loop.body.body[:-1]
+
+def for_loop_shape(loop):
+    # `for i from a to b`, where i can only ever be in [a, b]
+    simple = ("Identifier", "NumberLiteral")
+    if loop.start.kind.type not in simple or loop.end.kind.type not in simple:
+        return None
+
+    return loop.identifier, loop.start, loop.end, loop.body.body
+
+def is_index_of(node, index):
+    return (node.kind.type == "CallExpression" and node.callee.kind.type == "Identifier"
+            and len(node.arguments) == 1 and node.arguments[0].kind.type == "Identifier"
+            and node.arguments[0].symbol == index)
+
+def index_guard(loop, facts, pure):
+    shape = counted_loop_shape(loop) if loop.kind.type == "UntilStatement" else for_loop_shape(loop)
+    if not shape:
+        return None
+
+    index, start, bound, statements = shape
+    arrays = set()
+    written = set()
+    callees = set()
+    assigned = set()
+    skipped = set()
+    for statement in statements:
+        for node in walk(statement):
+            if id(node) in skipped:
+                continue
+
+            match node.kind.type:
+                case "IncludeStatement" | "ExcludeStatement" | "GetStatement":
+                    return None
+                case "UpdateStatement":
+                    if node.identifier.kind.type == "Identifier":
+                        assigned.add(node.identifier.symbol)
+                    elif is_index_of(node.identifier, index):
+                        written.add(node.identifier.callee.symbol)
+                case "CallExpression":
+                    if node.callee.kind.type != "Identifier":
+                        return None
+
+                    if is_index_of(node, index):
+                        arrays.add(node.callee.symbol)
+                    else:
+                        callees.add(node.callee.symbol)
+
+                    if node.callee.symbol in facts.modules and node.arguments and node.arguments[0].kind.type == "CallExpression":
+                        skipped.add(id(node.arguments[0].callee))
+
+            assigned.update(bound_names(node))
+
+    if not arrays:
+        return None
+
+    plain_arrays = set()
+    for name in callees - arrays:
+        if name in facts.bindings:
+            if name in pure and facts.bound_once(name):
+                continue
+
+            if name in facts.modules and facts.modules[name].module in PURE_MODULES and facts.bound_once(name):
+                continue
+
+            # building a record never touches an array
+            if name in facts.records and facts.bound_once(name):
+                continue
+        elif name in NON_MUTATING_BUILTINS:
+            continue
+
+        # anything else must still be an array when the loop starts, so calling it cannot mutate
+        plain_arrays.add(name)
+
+    watched = {index} | arrays | plain_arrays
+    for limit in (start, bound):
+        if limit.kind.type == "Identifier":
+            watched.add(limit.symbol)
+
+    if watched & assigned:
+        return None
+
+    return IndexGuard(index, start, bound, sorted(arrays), sorted(plain_arrays), sorted(written))
+
+def rewrite(node, replace, enter=lambda node: True):
+    # replaces every node below this one with replace(node), top down
+    if not enter(node):
+        return
+
+    for name, child in list(vars(node).items()):
+        if isinstance(child, list):
+            for i, element in enumerate(child):
+                if hasattr(element, "kind"):
+                    child[i] = replace(element)
+                    rewrite(child[i], replace, enter)
+        elif hasattr(child, "kind"):
+            setattr(node, name, replace(child))
+            rewrite(getattr(node, name), replace, enter)
+
+def remove_index_checks(body, index, arrays):
+    def unchecked(node):
+        if is_index_of(node, index) and node.callee.symbol in arrays:
+            return UncheckedIndexExpression(node.callee.symbol, index)
+
+        return node
+
+    # a function declared in the loop may be called after the loop is over
+    rewrite(body, unchecked, lambda node: node.kind.type != "FunctionDeclarationStatement")
+
+def eliminate_bounds_checks(program, facts, pure):
+    # inner loops first, so the copies made for outer loops keep their guards
+    loops = [node for node in walk(program) if node.kind.type in ("UntilStatement", "ForStatement")]
+    for loop in reversed(loops):
+        guard = index_guard(loop, facts, pure)
+        if not guard:
+            continue
+
+        body = deepcopy(loop.body)
+        remove_index_checks(body, guard.index, guard.arrays)
+        loop.guard = guard
+        loop.unchecked_body = body
+
+def constant_key(node):
+    match node.kind.type:
+        case "NumberLiteral":
+            return ("number", node.value)
+        case "StringLiteral":
+            return ("string", node.value)
+        case "BooleanLiteral":
+            return ("boolean", node.value)
+        case "UnaryExpression":
+            if node.value.kind.type == "NumberLiteral":
+                return ("number", -node.value.value if node.sign == "-" else node.value.value)
+
+    return None
+
+def switch_arm(node):
+    # matches `x = constant` or `constant = x`, returning (x, key)
+    condition = node.condition
+    if condition.kind.type != "ComparisonExpression" or condition.operator != "Equals":
+        return None
+
+    for subject, constant in ((condition.left, condition.right), (condition.right, condition.left)):
+        if subject.kind.type == "Identifier":
+            key = constant_key(constant)
+            if key:
+                return subject, key
+
+    return None
+
+def jump_table(head):
+    if head.kind.type != "IfUnlessElseStatement":
+        return head
+
+    first = switch_arm(head)
+    if not first:
+        return head
+
+    subject = first[0]
+    table = {}
+    arms = []
+    node = head
+    while node and node.kind.type == "IfUnlessElseStatement":
+        arm = switch_arm(node)
+        if not arm or arm[0].symbol != subject.symbol:
+            break
+
+        # the first arm testing a constant wins, as it would in the chain
+        table.setdefault(arm[1], len(arms))
+        arms += [node.body]
+        node = node.next
+
+    if len(arms) < JUMP_TABLE_THRESHOLD:
+        return head
+
+    return JumpTableStatement(subject, table, arms, node)
+
+def optimize(program):
+    pure = analyse_purity(program)
+    eliminate_bounds_checks(program, ProgramFacts(program), pure)
+    rewrite(program, jump_table)
+    return program
@@ -98,6 +98,12 @@ class Parser:
                 if rt.error:
                     return RuntimeResult(None, rt.error)
                 
+                return RuntimeResult(rt.result)
+            case "Record":
+                rt = self.parse_record_declaration()
+                if rt.error:
+                    return RuntimeResult(None, rt.error)
+                
                 return RuntimeResult(rt.result)
             case "Return":
                 rt = self.parse_return_statement()
@@ -370,6 +376,11 @@ class Parser:
 
     def parse_function_declaration(self):
         self.eat()
+        memoise = True
+        if self.at().type.type == "Uncached":
+            self.eat()
+            memoise = False
+
         rt = self.expect("Identifier", error=SyntaxError("Expected identifier", 99)) # unexpected
         if rt.error:
             return RuntimeResult(None, rt.error)
@@ -415,7 +426,41 @@ class Parser:
             return RuntimeResult(None, rt.error)
         
         body = rt.result
-        return RuntimeResult(FunctionDeclarationStatement(func_name, arguments, body))
+        return RuntimeResult(FunctionDeclarationStatement(func_name, arguments, body, memoise))
+
+    def parse_record_declaration(self):
+        self.eat()
+        rt = self.expect("Identifier", error=SyntaxError("Expected identifier", 99)) # unexpected
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+        
+        name = rt.result.value
+        rt = self.expect("With", error=SyntaxError("Expected 'with'", 99)) # unexpected
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+        
+        rt = self.expect("Colon", error=SyntaxError("Expected ':'", 99)) # unexpected
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+        
+        fields = []
+        while not self.in_end(self.at()):
+            rt = self.expect("Identifier", error=SyntaxError("Expected 'identifier'", 99)) # unexpected
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+            
+            if rt.result.value in fields:
+                return RuntimeResult(None, SyntaxError(f"Field '{rt.result.value}' is declared twice in record {name}", 99)) # unexpected
+
+            fields += [rt.result.value]
+            if self.in_end(self.at()):
+                break
+
+            rt = self.expect("Semi", error=SyntaxError("Expected ';'", 99)) # unexpected
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+        
+        return RuntimeResult(RecordDeclarationStatement(name, fields))
 
     def parse_return_statement(self):
         self.eat()
@@ -469,7 +514,7 @@ class Parser:
         if rt.error:
             return RuntimeResult(None, rt.error)
         
-        rt = self.expect("Until", error=SyntaxError("Expected 'until'", 99)) # unexpected
+        rt = self.expect("Until", "For", error=SyntaxError("Expected 'until' or 'for'", 99)) # unexpected
         if rt.error:
             return RuntimeResult(None, rt.error)
         
@@ -481,6 +526,66 @@ class Parser:
                     return RuntimeResult(None, rt.error)
                 
                 return RuntimeResult(rt.result)
+            case "For":
+                rt = self.parse_for_statement()
+                if rt.error:
+                    return RuntimeResult(None, rt.error)
+                
+                return RuntimeResult(rt.result)
+
+    def parse_for_statement(self):
+        self.eat()
+        rt = self.expect("Identifier", error=SyntaxError("Expected identifier", 99)) # unexpected
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+        
+        identifier = rt.result.value
+        rt = self.expect("From", "In", error=SyntaxError("Expected 'from' or 'in'", 99)) # unexpected
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+        
+        each = rt.result.type.type == "In"
+        rt = self.parse_expression()
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+        
+        start = rt.result
+        if not each:
+            rt = self.expect("To", error=SyntaxError("Expected 'to'", 99)) # unexpected
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+            
+            rt = self.parse_expression()
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+            
+            end = rt.result
+
+        if not self.in_end(self.at()):
+            return RuntimeResult(None, SyntaxError(f"Expected newline or nothing, got '{self.at().value}'", 99)) # unexpected
+
+        body = []
+        while self.not_eof():
+            while self.at().type.type == "Newline":
+                body += [self.tokens.pop(0)]
+            
+            if self.at().type.type != "Tab":
+                break
+            
+            self.tokens.pop(0)
+            while not self.in_end(self.at()):
+                body += [self.tokens.pop(0)]
+        
+        parser = Parser(body + [Token(TokenType("EOF"), "EOF")], self.extension)
+        rt = parser.produce_ast()
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+        
+        body = rt.result
+        if each:
+            return RuntimeResult(ForEachStatement(identifier, start, body))
+
+        return RuntimeResult(ForStatement(identifier, start, end, body))
             
     def parse_stop_statement(self):
         self.eat()
@@ -530,7 +635,15 @@ class Parser:
             return RuntimeResult(None, rt.error)
         
         array = rt.result
-        return RuntimeResult(IncludeStatement(array, element))
+        if self.at().type.type != "At":
+            return RuntimeResult(IncludeStatement(array, element))
+        
+        self.eat()
+        rt = self.parse_expression()
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+        
+        return RuntimeResult(IncludeStatement(array, element, rt.result))
 
     def parse_exclude_statement(self):
         self.eat()
@@ -571,7 +684,7 @@ class Parser:
             return RuntimeResult(None, left.error)
         
         left = left.result
-        while self.at().type.type in ("Equals", "NotEquals", "GreaterThan", "GreaterThanOrEquals", "SmallerThan", "SmallerThanOrEquals"):
+        while self.at().type.type in ("Equals", "NotEquals", "GreaterThan", "GreaterThanOrEquals", "SmallerThan", "SmallerThanOrEquals", "In"):
             operator = self.eat()
             right = self.parse_additive_expression()
             if right.error:
@@ -662,6 +775,18 @@ class Parser:
         if rt.error:
             return RuntimeResult(None, rt.error)
         
+        if self.at().type.type == "Of":
+            if rt.result.kind.type != "Identifier":
+                return RuntimeResult(None, SyntaxError("Expected a field name before 'of'", 99)) # unexpected
+
+            self.eat()
+            field = rt.result.symbol
+            rt = self.parse_call_expression()
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+            
+            return RuntimeResult(FieldExpression(field, rt.result))
+
         if self.at().type.type != "Colon":
             return RuntimeResult(rt.result)
         
@@ -671,24 +796,32 @@ class Parser:
         stack = []
         self.eat()
         while not self.in_end(self.at()):
-            if self.at().type.type in ("OpenBracket", "OpenParen"):
+            if self.at().type.type in ("OpenBracket", "OpenParen", "OpenBrace"):
                 stack += [self.at().type.type]
             elif self.at().type.type == "CloseParen":
                 if not stack:
                     break
                 
-                if stack[0] != "OpenParen":
+                if stack[-1] != "OpenParen":
                     return RuntimeResult(None, SyntaxError("Unexpected ')'", 42))
 
-                stack.pop(0)
+                stack.pop()
             elif self.at().type.type == "CloseBracket":
                 if not stack:
                     break
                 
-                if stack[0] != "OpenBracket":
+                if stack[-1] != "OpenBracket":
                     return RuntimeResult(None, SyntaxError("Unexpected ']'", 69))
 
-                stack.pop(0)
+                stack.pop()
+            elif self.at().type.type == "CloseBrace":
+                if not stack:
+                    break
+                
+                if stack[-1] != "OpenBrace":
+                    return RuntimeResult(None, SyntaxError("Unexpected '}'", 99)) # unexpected
+
+                stack.pop()
             
             inside += [self.eat()]
         
@@ -703,28 +836,38 @@ class Parser:
             else:
                 element += [token]
             
-            if token.type.type in ("OpenBracket", "OpenParen"):
+            if token.type.type in ("OpenBracket", "OpenParen", "OpenBrace"):
                 stack += [token.type.type]
             elif token.type.type == "CloseParen":
                 if "OpenParen" not in stack:
                     return RuntimeResult(None, SyntaxError("Unexpected ')'", 63))
                 
-                if stack[0] != "OpenParen":
+                if stack[-1] != "OpenParen":
                     return RuntimeResult(None, SyntaxError("Unexpected ')'", 84))
 
-                stack.pop(0)
+                stack.pop()
             elif token.type.type == "CloseBracket":
                 if "OpenBracket" not in stack:
                     return RuntimeResult(None, SyntaxError("Unexpected ']'", 17))
                 
-                if stack[0] != "OpenBracket":
+                if stack[-1] != "OpenBracket":
                     return RuntimeResult(None, SyntaxError("Unexpected ']'", 27))
 
-                stack.pop(0)
+                stack.pop()
+            elif token.type.type == "CloseBrace":
+                if "OpenBrace" not in stack or stack[-1] != "OpenBrace":
+                    return RuntimeResult(None, SyntaxError("Unexpected '}'", 99)) # unexpected
+
+                stack.pop()
         
         if element:
             elements += [element]
         
+        if len(elements) == 1:
+            rt = self.parse_slice(callee, elements[0])
+            if rt.error or rt.result:
+                return rt
+
         new = []
         for element in elements:
             parser = Parser(element + [Token(TokenType("EOF"), "EOF")], self.extension)
@@ -736,6 +879,33 @@ class Parser:
         
         return RuntimeResult(CallExpression(callee, new))
 
+    def parse_slice(self, callee, tokens):
+        # `a: i to j`, only when the single argument has a 'to' outside any brackets
+        # and no call of its own before it (`show: a: i to j` slices a, not show)
+        depth = 0
+        for i, token in enumerate(tokens):
+            if token.type.type in ("OpenBracket", "OpenParen", "OpenBrace"):
+                depth += 1
+            elif token.type.type in ("CloseBracket", "CloseParen", "CloseBrace"):
+                depth -= 1
+            elif token.type.type == "Colon" and not depth:
+                return RuntimeResult(None)
+            elif token.type.type == "To" and not depth:
+                break
+        else:
+            return RuntimeResult(None)
+        
+        bounds = []
+        for part in (tokens[:i], tokens[i + 1:]):
+            parser = Parser(part + [Token(TokenType("EOF"), "EOF")], self.extension)
+            rt = parser.parse_expression()
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+            
+            bounds += [rt.result]
+        
+        return RuntimeResult(SliceExpression(callee, *bounds))
+
     def parse_primary_expression(self):
         match self.at().type.type:
             case "Identifier":
@@ -752,7 +922,8 @@ class Parser:
                 self.eat()
                 return RuntimeResult(NullLiteral())
             case "String":
-                return RuntimeResult(StringLiteral(self.eat().value.encode().decode('unicode_escape')))
+                # characters outside latin-1 go through as \u escapes, so only the escapes in the source are decoded
+                return RuntimeResult(StringLiteral(self.eat().value.encode("latin-1", "backslashreplace").decode("unicode_escape")))
             case "OpenParen":
                 self.eat()
                 expression = self.parse_expression()
@@ -770,24 +941,29 @@ class Parser:
                 stack = []
                 while (self.at().type.type != "CloseBracket" or stack) and self.at().type.type != "EOF":
                     token = self.eat()
-                    if token.type.type in ("OpenBracket", "OpenParen"):
+                    if token.type.type in ("OpenBracket", "OpenParen", "OpenBrace"):
                         stack += [token.type.type]
                     elif token.type.type == "CloseParen":
                         if "OpenParen" not in stack:
                             return RuntimeResult(None, SyntaxError("Unexpected ')'", 89))
                         
-                        if stack[0] != "OpenParen":
+                        if stack[-1] != "OpenParen":
                             return RuntimeResult(None, SyntaxError("Unexpected ')'", 6))
 
-                        stack.pop(0)
+                        stack.pop()
                     elif token.type.type == "CloseBracket":
                         if "OpenBracket" not in stack:
                             return RuntimeResult(None, SyntaxError("Unexpected ']'", 8))
                         
-                        if stack[0] != "OpenBracket":
+                        if stack[-1] != "OpenBracket":
                             return RuntimeResult(None, SyntaxError("Unexpected ']'", 23))
 
-                        stack.pop(0)
+                        stack.pop()
+                    elif token.type.type == "CloseBrace":
+                        if "OpenBrace" not in stack or stack[-1] != "OpenBrace":
+                            return RuntimeResult(None, SyntaxError("Unexpected '}'", 99)) # unexpected
+
+                        stack.pop()
                     
                     inside += [token]
                 
@@ -807,24 +983,29 @@ class Parser:
                     elif not self.in_end(token):
                         element += [token]
                     
-                    if token.type.type in ("OpenBracket", "OpenParen"):
+                    if token.type.type in ("OpenBracket", "OpenParen", "OpenBrace"):
                         stack += [token.type.type]
                     elif token.type.type == "CloseParen":
                         if "OpenParen" not in stack:
                             return RuntimeResult(None, SyntaxError("Unexpected ')'", 63))
                         
-                        if stack[0] != "OpenParen":
+                        if stack[-1] != "OpenParen":
                             return RuntimeResult(None, SyntaxError("Unexpected ')'", 84))
 
-                        stack.pop(0)
+                        stack.pop()
                     elif token.type.type == "CloseBracket":
                         if "OpenBracket" not in stack:
                             return RuntimeResult(None, SyntaxError("Unexpected ']'", 17))
                         
-                        if stack[0] != "OpenBracket":
+                        if stack[-1] != "OpenBracket":
                             return RuntimeResult(None, SyntaxError("Unexpected ']'", 27))
 
-                        stack.pop(0)
+                        stack.pop()
+                    elif token.type.type == "CloseBrace":
+                        if "OpenBrace" not in stack or stack[-1] != "OpenBrace":
+                            return RuntimeResult(None, SyntaxError("Unexpected '}'", 99)) # unexpected
+
+                        stack.pop()
                 
                 if element:
                     elements += [element]
@@ -839,5 +1020,71 @@ class Parser:
                     new += [rt.result]
                 
                 return RuntimeResult(ArrayLiteral(new))
+            case "OpenBrace":
+                return self.parse_brace_literal()
             case _:
-                return RuntimeResult(None, SyntaxError(f"Unexpected token found: '{self.at()}'", 11))
\ No newline at end of file
+                return RuntimeResult(None, SyntaxError(f"Unexpected token found: '{self.at()}'", 11))
+
+    def parse_brace_literal(self):
+        # {key: value; ...} is a dictionary, {element; ...} a set and {} an empty dictionary
+        self.eat()
+        elements = []
+        element = []
+        stack = []
+        while self.at().type.type != "CloseBrace" or stack:
+            if self.at().type.type == "EOF":
+                return RuntimeResult(None, SyntaxError("Expected '}'", 99)) # unexpected
+
+            token = self.eat()
+            if token.type.type in ("OpenBracket", "OpenParen", "OpenBrace"):
+                stack += [token.type.type]
+            elif token.type.type in ("CloseBracket", "CloseParen", "CloseBrace"):
+                if not stack or stack[-1] != token.type.type.replace("Close", "Open"):
+                    return RuntimeResult(None, SyntaxError(f"Unexpected '{token.value}'", 99)) # unexpected
+
+                stack.pop()
+            
+            if token.type.type == "Semi" and not stack:
+                if element:
+                    elements += [element]
+                    element = []
+            elif not self.in_end(token) and not self.in_whitespace(token):
+                element += [token]
+        
+        self.eat()
+        if element:
+            elements += [element]
+
+        keys = []
+        values = []
+        pairs = None
+        for element in elements:
+            depth = 0
+            colon = None
+            for i, token in enumerate(element):
+                if token.type.type in ("OpenBracket", "OpenParen", "OpenBrace"):
+                    depth += 1
+                elif token.type.type in ("CloseBracket", "CloseParen", "CloseBrace"):
+                    depth -= 1
+                elif token.type.type == "Colon" and not depth:
+                    colon = i
+                    break
+            
+            if pairs is None:
+                pairs = colon is not None
+            elif pairs != (colon is not None):
+                return RuntimeResult(None, SyntaxError("Expected either only 'key: value' pairs or no pairs in '{ }'", 99)) # unexpected
+
+            parts = [element[:colon], element[colon + 1:]] if pairs else [element]
+            for part, target in zip(parts, [keys, values] if pairs else [values]):
+                parser = Parser(part + [Token(TokenType("EOF"), "EOF")], self.extension)
+                rt = parser.parse_expression()
+                if rt.error:
+                    return RuntimeResult(None, rt.error)
+                
+                target += [rt.result]
+        
+        if pairs is False:
+            return RuntimeResult(SetLiteral(values))
+
+        return RuntimeResult(DictionaryLiteral(keys, values))
\ No newline at end of file
@@ -0,0 +1,140 @@
+from array import array
+from bisect import bisect_left
+from ..errors import RuntimeResult, DataTypeError, ArgumentError
+import flu.runtime.values as v
+import flu.runtime.builtin_functions as builtin_functions
+
+# the argument types are declared where these are registered, so packed arrays
+# are worked on as they are without being checked or translated here
+
+def sort_keys(name, values):
+    # the Python values to order by, which must be all numbers or all strings
+    kinds = {value.type.type for value in values}
+    if not kinds <= {"number"} and not kinds <= {"string"}:
+        return RuntimeResult(None, DataTypeError(f"Expected only numbers or only strings in {name}, got {' and '.join(sorted(kinds))}", 99)) # unexpected
+
+    return RuntimeResult([value.value for value in values])
+
+def length(arguments):
+    value = arguments[0]
+    if value.type.type == "string":
+        return RuntimeResult(v.Number(len(value.value)))
+
+    return RuntimeResult(v.Number(len(value)))
+
+def sort(arguments):
+    # sort: array, or sort: array; key function; sorts in place and gives the array back
+    if len(arguments) not in (1, 2):
+        return RuntimeResult(None, ArgumentError(f"Expected 1 or 2 arguments in sort, got {len(arguments)}", 39))
+
+    target = arguments[0]
+    target.own()
+    if len(arguments) == 1 and target.packed:
+        target.elements = array(target.elements.typecode, sorted(target.elements))
+        return RuntimeResult(target)
+
+    values = list(target)
+    if len(arguments) == 1:
+        rt = sort_keys("sort", values)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        keys = rt.result
+    else:
+        function = arguments[1]
+        results = []
+        for value in values:
+            rt = builtin_functions.call_function(function, [value])
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+
+            results += [rt.result]
+
+        rt = sort_keys("the keys of sort", results)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        keys = rt.result
+
+    # sorting positions keeps the sort stable and calls the key function once per element
+    order = sorted(range(len(values)), key=keys.__getitem__)
+    target.value = [values[i] for i in order]
+    return RuntimeResult(target)
+
+def search(arguments):
+    # binary search in a sorted array, the position of the element or 0 when it is not there
+    target, element = arguments
+    if target.packed:
+        if element.type.type != "number":
+            return RuntimeResult(v.Number(0))
+
+        elements = target.storage()
+        i = bisect_left(elements, element.value)
+        return RuntimeResult(v.Number(i + 1 if i < len(elements) and elements[i] == element.value else 0))
+
+    rt = sort_keys("search", list(target) + [element])
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    keys = rt.result[:-1]
+    i = bisect_left(keys, element.value)
+    return RuntimeResult(v.Number(i + 1 if i < len(keys) and keys[i] == element.value else 0))
+
+def reverse(arguments):
+    # reverses in place and gives the array back
+    target = arguments[0]
+    target.own()
+    if target.packed:
+        target.elements.reverse()
+    else:
+        target.value = list(target)[::-1]
+
+    return RuntimeResult(target)
+
+def indexof(arguments):
+    # the first position of the element in an array (or of a piece of a string), 0 when it is not there
+    collection, element = arguments
+    if collection.type.type == "string":
+        if element.type.type != "string":
+            return RuntimeResult(None, DataTypeError(f"Expected string in indexof, got {element.type.type}", 99)) # unexpected
+
+        return RuntimeResult(v.Number(collection.value.find(element.value) + 1))
+
+    if collection.packed:
+        if element.type.type != "number":
+            return RuntimeResult(v.Number(0))
+
+        try:
+            return RuntimeResult(v.Number(collection.storage().index(element.value) + 1))
+        except ValueError:
+            return RuntimeResult(v.Number(0))
+
+    for i, other in enumerate(collection):
+        if v.values_equal(element, other):
+            return RuntimeResult(v.Number(i + 1))
+
+    return RuntimeResult(v.Number(0))
+
+def concat(arguments):
+    # a new array with the elements of every argument, one after the other
+    typecodes = {argument.elements.typecode if argument.packed else None for argument in arguments}
+    if len(typecodes) == 1 and None not in typecodes:
+        result = array(typecodes.pop())
+        for argument in arguments:
+            result.extend(argument.storage())
+
+        return RuntimeResult(v.create_number_array(result))
+
+    values = []
+    for argument in arguments:
+        values.extend(argument)
+
+    return RuntimeResult(v.Array(values))
+
+def join(arguments):
+    # join: array; separator, strings are joined as they are and anything else as show prints it
+    if len(arguments) not in (1, 2):
+        return RuntimeResult(None, ArgumentError(f"Expected 1 or 2 arguments in join, got {len(arguments)}", 39))
+
+    separator = arguments[1].value if len(arguments) == 2 else ""
+    return RuntimeResult(v.String(separator.join([element.__repr__() for element in arguments[0]])))
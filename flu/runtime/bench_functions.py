@@ -0,0 +1,104 @@
+import gc
+import math
+import time
+import tracemalloc
+from ..errors import RuntimeResult, ValueError, ArgumentError
+import flu.runtime.values as v
+import flu.runtime.builtin_functions as builtin_functions
+
+# the bench module, loaded with `get: module bench`; times Fluentix code from inside
+# a script with the same monotonic clock Python's own benchmarks use
+
+def clock(arguments):
+    # seconds from a fixed but unspecified point, only differences between two readings mean anything
+    return RuntimeResult(time.perf_counter())
+
+def collections():
+    return sum(generation["collections"] for generation in gc.get_stats())
+
+def count(name, value, least):
+    if value.value % 1 != 0 or value.value < least:
+        return RuntimeResult(None, ValueError(f"Expected a whole number of at least {least} in {name}, got {value.__repr__()}", 99)) # unexpected
+
+    return RuntimeResult(int(value.value))
+
+def measure(arguments):
+    # measure: function; runs; warmup calls the function warmup times (1 by default) untimed,
+    # then runs times, and gives the timings in seconds and what the calls cost in memory
+    if len(arguments) not in (2, 3):
+        return RuntimeResult(None, ArgumentError(f"Expected 2 or 3 arguments in measure, got {len(arguments)}", 39))
+
+    function = arguments[0]
+    rt = count("measure", arguments[1], 1)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    runs = rt.result
+    rt = count("measure", arguments[2], 0) if len(arguments) == 3 else RuntimeResult(1)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    # a memoised function would only be looked up after its first call, so its cache
+    # is set aside while it is measured, for its own recursive calls as well
+    cache = getattr(function, "cache", None)
+    if cache is not None:
+        function.cache = None
+
+    try:
+        return run(function, runs, rt.result)
+    finally:
+        if cache is not None:
+            function.cache = cache
+
+def run(function, runs, warmup):
+    for _ in range(warmup):
+        rt = builtin_functions.call_function(function, [])
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+    timings = []
+    collected = collections()
+    for _ in range(runs):
+        start = time.perf_counter()
+        rt = builtin_functions.call_function(function, [])
+        timings.append(time.perf_counter() - start)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+    collected = collections() - collected
+
+    # tracing slows every allocation down, so memory is measured by one more call of its own
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    rt = builtin_functions.call_function(function, [])
+    current, peak = tracemalloc.get_traced_memory()
+    if not tracing:
+        tracemalloc.stop()
+
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    timings.sort()
+    return RuntimeResult(v.Dictionary({
+        "runs": v.Number(runs),
+        "min": v.Number(timings[0]),
+        "median": v.Number((timings[(runs - 1) // 2] + timings[runs // 2]) / 2),
+        "p95": v.Number(timings[math.ceil(runs * 0.95) - 1]),
+        "max": v.Number(timings[-1]),
+        "total": v.Number(math.fsum(timings)),
+        # bytes allocated at the busiest point of one call, and bytes it left allocated
+        "peak": v.Number(max(peak - before, 0)),
+        "retained": v.Number(current - before),
+        # garbage collections run during the timed calls
+        "collections": v.Number(collected)
+    }))
+
+def module():
+    module = v.Module("bench")
+    module.assign("clock", v.NativeFunction("clock", clock, 0))
+    module.assign("measure", v.NativeFunction("measure", measure, None, (v.FUNCTION, v.NUMBER)))
+    return module
@@ -1,66 +1,479 @@
 import sys
-from ..errors import RuntimeResult, DataTypeError, SyntaxError
+import math
+import builtins
+from itertools import islice
+from array import array
+from ..errors import RuntimeResult, DataTypeError, SyntaxError, ValueError, ArgumentError
 import flu.runtime.values as v
+import flu.runtime.vector as vector
+import flu.runtime.output as output
 
 def show(arguments, newline=True):
-    sys.stdout.write(" ".join([v.translate_python_to_fluentix(argument).__repr__() for argument in arguments]))
+    for i, argument in enumerate(arguments):
+        if i:
+            output.write(" ")
+
+        output.write_value(argument)
+
     if newline:
-        sys.stdout.write("\n")
+        output.write("\n")
 
+    output.finish()
     return RuntimeResult(None)
 
 def ask(arguments):
     show(arguments, False)
+    # the prompt and everything before it must be on screen before waiting for the answer
+    output.flush()
     return RuntimeResult(sys.stdin.readline()[0:-1])
 
+def readall(arguments):
+    # everything left on the standard input in one read; through the text layer, so
+    # whatever ask or lines already buffered past the line they read is not lost
+    return RuntimeResult(sys.stdin.read())
+
+def readnumbers(arguments):
+    # every whitespace separated number left on the standard input, straight into a packed array
+    words = sys.stdin.read().split()
+    try:
+        return RuntimeResult(v.create_number_array(array("q", map(int, words))))
+    except (builtins.ValueError, OverflowError):
+        pass
+
+    for word in words:
+        try:
+            float(word)
+        except builtins.ValueError:
+            return RuntimeResult(None, DataTypeError(f"Expected only numbers in the input, got '{word}'", 99)) # unexpected
+
+    return RuntimeResult(v.create_number_array(array("d", map(float, words))))
+
 def stop(arguments):
-    sys.exit(arguments[0])
+    sys.exit(v.translate_fluentix_to_python(arguments[0]))
 
 def tonumber(arguments):
-    if isinstance(arguments[0], bool):
-        return RuntimeResult(int(arguments[0]))
-    
-    if isinstance(arguments[0], (int, float)):
-        return RuntimeResult(arguments[0])
+    value = arguments[0]
+    match value.type.type:
+        case "number":
+            return RuntimeResult(value)
+        case "boolean":
+            return RuntimeResult(int(value.value == "true"))
+        case "string":
+            try:
+                return RuntimeResult(float(value.value))
+            except builtins.ValueError:
+                return RuntimeResult(None, DataTypeError(f"Cannot convert string '{value.value}' to a number", 99)) # unexpected
+        case "null":
+            return RuntimeResult(0)
 
-    if isinstance(arguments[0], str):
-        try:
-            return RuntimeResult(float(arguments[0]))
-        except ValueError:
-            return RuntimeResult(None, DataTypeError(f"Cannot convert string '{arguments[0]}' to a number", 99)) # unexpected
-    
-    if arguments[0] == None:
-        return RuntimeResult(0)
-    
-    if isinstance(arguments[0], (list, tuple, set)):
-        return RuntimeResult(None, DataTypeError("Cannot convert array to a number"), 99) # unexpected
-    
+    return RuntimeResult(None, DataTypeError(f"Cannot convert {value.type.type} to a number", 99)) # unexpected
 
 def tostring(arguments):
-    if isinstance(arguments[0], bool):
-        return RuntimeResult(str(arguments[0]).lower())
-    
-    if isinstance(arguments[0], (int, float)):
-        return RuntimeResult(str(arguments[0]))
-
-    if isinstance(arguments[0], str):
+    if arguments[0].type.type == "string":
         return RuntimeResult(arguments[0])
-    
-    if arguments[0] == None:
-        return RuntimeResult("null")
-    
-    if isinstance(arguments[0], (list, tuple, set)):
-        return RuntimeResult(str([tostring([element]) for element in arguments[0]]))
-    
+
+    return RuntimeResult(arguments[0].__repr__())
 
 def absolute(arguments):
     value = arguments[0]
-    if isinstance(value, (int, float)):
-        return RuntimeResult(abs(value))
+    if value.type.type == "number":
+        return RuntimeResult(abs(value.value))
+
+    try:
+        return RuntimeResult(abs(float(value.value)))
+    except builtins.ValueError:
+        return RuntimeResult(None, DataTypeError(f"Absolute value '{value.value}' must be a number.", 99)) # unexpected
+
+def memostats(arguments):
+    function = arguments[0]
+    if function.cache is None:
+        return RuntimeResult(None, ValueError(f"Function {function.name} is not memoised", 99)) # unexpected
+
+    return RuntimeResult([function.cache.hits, function.cache.misses, len(function.cache.table)])
+
+
+class Numbers:
+    # what a reduction runs over, either one array or sequence or the numbers themselves;
+    # each number is checked as it is pulled so a sequence never has to be held in memory,
+    # and the first problem ends the pass and is kept in error
+    def __init__(self, name, arguments):
+        self.name = name
+        self.source = arguments[0] if len(arguments) == 1 and arguments[0].type.type in ("array", "sequence") else arguments
+        self.error = None
+        self.count = 0
+
+    def __iter__(self):
+        if isinstance(self.source, v.Array) and self.source.packed:
+            # already known to be numbers, so they are read straight from the storage
+            self.count = len(self.source)
+            return iter(self.source.storage())
+
+        return self.checked()
+
+    def checked(self):
+        if isinstance(self.source, v.Sequence):
+            elements = self.pull(self.source.iterate())
+        else:
+            elements = self.source
+
+        for element in elements:
+            if element.type.type != "number":
+                self.error = DataTypeError(f"Expected number in {self.name}, got {element.type.type}", 99) # unexpected
+                return
+
+            self.count += 1
+            yield element.value
+
+    def pull(self, elements):
+        for rt in elements:
+            if rt.error:
+                self.error = rt.error
+                return
+
+            yield rt.result
+
+def reduce_numbers(name, arguments, function):
+    numbers = Numbers(name, arguments)
+    result = function(numbers)
+    if numbers.error:
+        return RuntimeResult(None, numbers.error)
+
+    if not numbers.count:
+        return RuntimeResult(None, ValueError(f"Expected at least 1 number in {name}, got 0", 99)) # unexpected
+
+    return RuntimeResult(result)
+
+def sum_(arguments):
+    return reduce_numbers("sum", arguments, sum)
+
+def product(arguments):
+    return reduce_numbers("product", arguments, math.prod)
+
+def min_(arguments):
+    return reduce_numbers("min", arguments, lambda numbers: min(numbers, default=None))
+
+def max_(arguments):
+    return reduce_numbers("max", arguments, lambda numbers: max(numbers, default=None))
+
+def mean(arguments):
+    def average(numbers):
+        total = sum(numbers)
+        return total / numbers.count if numbers.count else None
+
+    return reduce_numbers("mean", arguments, average)
+
+
+def matrix(arguments):
+    # `matrix: rows; columns` is all zeros, `matrix: [[...]; [...]]` copies the rows
+    if len(arguments) == 2 and all(argument.type.type == "number" and isinstance(argument.value, int) for argument in arguments):
+        if min(arguments[0].value, arguments[1].value) < 0:
+            return RuntimeResult(None, ValueError(f"Expected a number larger than or equals to 0, got {min(arguments[0].value, arguments[1].value)}", 99)) # unexpected
+
+        return RuntimeResult(v.Matrix(arguments[0].value, arguments[1].value))
+
+    if len(arguments) != 1 or arguments[0].type.type != "array":
+        return RuntimeResult(None, ArgumentError("Expected an array of rows, or the number of rows and columns in matrix", 99)) # unexpected
+
+    rows = []
+    for row in arguments[0]:
+        if row.type.type != "array":
+            return RuntimeResult(None, ValueError("Expected rows of the same length in matrix", 99)) # unexpected
+
+        # packed rows are read as they are, boxed ones are unboxed where they hold numbers
+        rows += [list(row.storage()) if row.packed else [element.value if element.type.type == "number" else element for element in row]]
+
+    return matrix_from_rows(rows)
+
+def matrix_from_rows(rows):
+    for row in rows:
+        if not isinstance(row, list) or len(row) != len(rows[0]):
+            return RuntimeResult(None, ValueError("Expected rows of the same length in matrix", 99)) # unexpected
+
+        for number in row:
+            if isinstance(number, bool) or not isinstance(number, (int, float)):
+                return RuntimeResult(None, DataTypeError(f"Expected number in matrix, got {v.translate_python_to_fluentix(number).type.type}", 99)) # unexpected
+
+    return RuntimeResult(v.Matrix.from_rows(rows))
+
+def transpose(arguments):
+    return RuntimeResult(arguments[0].transpose())
+
+def matmul(arguments):
+    return vector.matrix_multiply(*arguments)
+
+def row(arguments):
+    return matrix_slice("row", arguments)
+
+def column(arguments):
+    return matrix_slice("column", arguments)
+
+def matrix_slice(name, arguments):
+    matrix, index = arguments
+    length = matrix.rows if name == "row" else matrix.columns
+    if not isinstance(index.value, int) or not 1 <= index.value <= length:
+        return RuntimeResult(None, ValueError(f"Expected a whole number from 1 to {length} in {name}, got {index.__repr__()}", 99)) # unexpected
+
+    if name == "row":
+        return RuntimeResult(matrix.row(index.value - 1))
+
+    return RuntimeResult(matrix.column(index.value - 1))
+
+def shape(arguments):
+    return RuntimeResult([arguments[0].rows, arguments[0].columns])
+
+def loadmatrix(arguments):
+    # one row per line, numbers separated by spaces or commas
+    path = arguments[0].value
+    try:
+        with open(path) as file:
+            lines = [line.replace(",", " ").split() for line in file]
+    except OSError as error:
+        return RuntimeResult(None, ValueError(f"Cannot read '{path}': {error.strerror}", 99)) # unexpected
+
+    try:
+        rows = [[float(number) for number in line] for line in lines if line]
+    except builtins.ValueError:
+        return RuntimeResult(None, DataTypeError(f"Expected only numbers in '{path}'", 99)) # unexpected
+
+    return matrix_from_rows(rows)
+
+
+def set_(arguments):
+    # set: [array] or set: a; b; c
+    elements = arguments[0] if len(arguments) == 1 and arguments[0].type.type in ("array", "dictionary", "set") else arguments
+    if isinstance(elements, (v.Dictionary, v.Set)):
+        return RuntimeResult(set(elements.value))
+
+    keys = set()
+    for element in elements:
+        key = v.hash_key(element)
+        if key is None:
+            return RuntimeResult(None, DataTypeError(f"Expected number, string or boolean in set, got {element.type.type}", 99)) # unexpected
+
+        keys.add(key)
 
-    elif isinstance(value, str):
+    return RuntimeResult(v.Set(keys))
+
+def keys(arguments):
+    return RuntimeResult(list(arguments[0].value))
+
+def values(arguments):
+    dictionary = arguments[0]
+    return RuntimeResult([dictionary.get(key) for key in dictionary.value])
+
+
+def persistent(arguments):
+    if isinstance(arguments[0], v.PersistentArray):
+        return RuntimeResult(arguments[0].copy())
+
+    return RuntimeResult(v.PersistentArray(arguments[0]))
+
+def copy(arguments):
+    # shallow: a persistent array shares its whole trie, anything else is copied one level deep
+    value = arguments[0]
+    match value.type.type:
+        case "array":
+            if isinstance(value, v.PersistentArray):
+                return RuntimeResult(value.copy())
+
+            elements = value.storage()
+            return RuntimeResult(v.create_number_array(elements[:]) if value.packed else v.Array(elements))
+        case "dictionary":
+            return RuntimeResult(v.Dictionary(dict(value.value)))
+        case "set":
+            return RuntimeResult(v.Set(set(value.value)))
+        case "matrix":
+            return RuntimeResult(v.Matrix.from_rows(value.to_rows()))
+
+    # numbers, strings and the rest are never changed in place
+    return RuntimeResult(value)
+
+
+def call_function(function, arguments):
+    # calls a function handed to a builtin the same way a call expression would
+    if function.type.type == "native function":
+        return function.call(arguments)
+
+    return function.call(arguments, function.environment, False)
+
+def whole_number(name, value):
+    if value.type.type != "number" or value.value % 1 != 0:
+        return RuntimeResult(None, ValueError(f"Expected a whole number in {name}, got {value.__repr__()}", 99)) # unexpected
+
+    return RuntimeResult(int(value.value))
+
+def range_(arguments):
+    # range: start; end, or range: start; end; step, both ends included like a for loop
+    if len(arguments) not in (2, 3):
+        return RuntimeResult(None, ArgumentError(f"Expected 2 or 3 arguments in range, got {len(arguments)}", 39))
+
+    start, end, step = ([argument.value for argument in arguments] + [1])[:3]
+    if step == 0:
+        return RuntimeResult(None, ValueError("Expected a step other than 0 in range", 99)) # unexpected
+
+    # computing every element from start keeps fractional steps from drifting
+    count = max(math.floor((end - start) / step) + 1, 0)
+    return RuntimeResult(v.Sequence(lambda: (RuntimeResult(v.create_number(start + i * step)) for i in range(count))))
+
+def lines(arguments):
+    # lines: path reads a file one line at a time, lines: on its own reads the standard input
+    if len(arguments) > 1:
+        return RuntimeResult(None, ArgumentError(f"Expected at most 1 argument in lines, got {len(arguments)}", 39))
+
+    if not arguments:
+        return RuntimeResult(v.Sequence(lambda: read_lines(sys.stdin)))
+
+    path = arguments[0].value
+    return RuntimeResult(v.Sequence(lambda: read_file_lines(path)))
+
+def read_lines(file):
+    for line in file:
+        yield RuntimeResult(v.String(line.rstrip("\r\n")))
+
+def read_file_lines(path):
+    try:
+        file = open(path)
+    except OSError as error:
+        yield RuntimeResult(None, ValueError(f"Cannot read '{path}': {error.strerror}", 99)) # unexpected
+        return
+
+    with file:
+        yield from read_lines(file)
+
+def sequence_source(value):
+    # how to start a new pass over value, which NativeFunction.call already checked can be walked
+    return lambda: v.iterate(value).result
+
+def map_(arguments):
+    source, function = sequence_source(arguments[0]), arguments[1]
+    def mapped():
+        for rt in source():
+            if not rt.error:
+                rt = call_function(function, [rt.result])
+
+            yield rt
+            if rt.error:
+                return
+
+    return RuntimeResult(v.Sequence(mapped))
+
+def filter_(arguments):
+    source, function = sequence_source(arguments[0]), arguments[1]
+    def filtered():
+        for element in source():
+            if element.error:
+                yield element
+                return
+
+            rt = call_function(function, [element.result])
+            if not rt.error and rt.result.type.type != "boolean":
+                rt = RuntimeResult(None, DataTypeError(f"Expected boolean from the function in filter, got {rt.result.type.type}", 99)) # unexpected
+
+            if rt.error:
+                yield rt
+                return
+
+            if rt.result.value == "true":
+                yield element
+
+    return RuntimeResult(v.Sequence(filtered))
+
+def take(arguments):
+    source = sequence_source(arguments[0])
+    rt = whole_number("take", arguments[1])
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    count = max(rt.result, 0)
+    return RuntimeResult(v.Sequence(lambda: islice(source(), count)))
+
+def zip_(arguments):
+    # zip: a; b; ... gives [a element; b element; ...] until the shortest one runs out
+    if len(arguments) < 2:
+        return RuntimeResult(None, ArgumentError(f"Expected at least 2 arguments in zip, got {len(arguments)}", 39))
+
+    sources = [sequence_source(argument) for argument in arguments]
+
+    def zipped():
+        for elements in zip(*[source() for source in sources]):
+            for rt in elements:
+                if rt.error:
+                    yield rt
+                    return
+
+            yield RuntimeResult(v.Array([rt.result for rt in elements]))
+
+    return RuntimeResult(v.Sequence(zipped))
+
+def collect(arguments):
+    if arguments[0].type.type == "bytes":
+        # straight into a packed array, without boxing every byte first
+        return RuntimeResult(v.create_number_array(array("q", arguments[0].value)))
+
+    elements = []
+    for rt in v.iterate(arguments[0]).result:
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        elements += [rt.result]
+
+    return RuntimeResult(v.Array(elements))
+
+
+def bytes_(arguments):
+    # bytes: string; encoding (utf-8 by default), or bytes: array of numbers from 0 to 255
+    if len(arguments) not in (1, 2):
+        return RuntimeResult(None, ArgumentError(f"Expected 1 or 2 arguments in bytes, got {len(arguments)}", 39))
+
+    value = arguments[0]
+    if value.type.type == "string":
+        encoding = arguments[1].value if len(arguments) == 2 else "utf-8"
         try:
-            return RuntimeResult(abs(float(value)))
-        except:
-            pass
-    return RuntimeResult(None, DataTypeError(f"Absolute value '{value}' must be a number.", 99)) # unexpec
+            return RuntimeResult(value.value.encode(encoding))
+        except LookupError:
+            return RuntimeResult(None, ValueError(f"Unknown encoding '{encoding}'", 99)) # unexpected
+        except UnicodeEncodeError as error:
+            return RuntimeResult(None, ValueError(f"Cannot encode '{value.value[error.start]}' as {encoding}", 99)) # unexpected
+
+    if len(arguments) == 2:
+        return RuntimeResult(None, ArgumentError("Expected an encoding only when converting a string in bytes", 39))
+
+    if value.type.type == "bytes":
+        return RuntimeResult(value)
+
+    numbers = list(value.storage()) if value.packed else [element.value if element.type.type == "number" else element for element in value]
+    for number in numbers:
+        if not isinstance(number, int) or not 0 <= number <= 255:
+            return RuntimeResult(None, ValueError(f"Expected whole numbers from 0 to 255 in bytes, got {v.translate_python_to_fluentix(number).__repr__()}", 99)) # unexpected
+
+    return RuntimeResult(bytes(numbers))
+
+def decode(arguments):
+    if len(arguments) not in (1, 2):
+        return RuntimeResult(None, ArgumentError(f"Expected 1 or 2 arguments in decode, got {len(arguments)}", 39))
+
+    encoding = arguments[1].value if len(arguments) == 2 else "utf-8"
+    try:
+        return RuntimeResult(str(arguments[0].value, encoding))
+    except LookupError:
+        return RuntimeResult(None, ValueError(f"Unknown encoding '{encoding}'", 99)) # unexpected
+    except UnicodeDecodeError as error:
+        return RuntimeResult(None, ValueError(f"Cannot decode the bytes as {encoding}, byte {error.start + 1} is invalid", 99)) # unexpected
+
+def readbytes(arguments):
+    path = arguments[0].value
+    try:
+        with open(path, "rb") as file:
+            return RuntimeResult(file.read())
+    except OSError as error:
+        return RuntimeResult(None, ValueError(f"Cannot read '{path}': {error.strerror}", 99)) # unexpected
+
+def writebytes(arguments):
+    path, data = arguments[0].value, arguments[1].value
+    try:
+        with open(path, "wb") as file:
+            file.write(data)
+    except OSError as error:
+        return RuntimeResult(None, ValueError(f"Cannot write '{path}': {error.strerror}", 99)) # unexpected
+
+    return RuntimeResult(None)
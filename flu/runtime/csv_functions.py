@@ -0,0 +1,134 @@
+import builtins
+import csv
+import gc
+from array import array
+from ..errors import RuntimeResult, ValueError, ArgumentError
+import flu.runtime.values as v
+import flu.runtime.file_functions as file_functions
+
+# the csv module, loaded with `get: module csv`; parsing and quoting are done by
+# Python's csv module, rows are read one at a time and written through a buffered file
+
+def separator(name, arguments):
+    # the separator given after the path, a comma by default
+    if len(arguments) not in (1, 2):
+        return RuntimeResult(None, ArgumentError(f"Expected 1 or 2 arguments in {name}, got {len(arguments)}", 39))
+
+    if len(arguments) == 1:
+        return RuntimeResult(",")
+
+    if len(arguments[1].value) != 1:
+        return RuntimeResult(None, ValueError(f"Expected a separator of 1 character in {name}, got '{arguments[1].value}'", 99)) # unexpected
+
+    return RuntimeResult(arguments[1].value)
+
+def read_rows(path, delimiter):
+    # the fields of each line as Python strings
+    try:
+        file = open(path, newline="", encoding="utf-8", errors="replace")
+    except OSError as error:
+        yield RuntimeResult(None, ValueError(f"Cannot read '{path}': {error.strerror}", 99)) # unexpected
+        return
+
+    with file:
+        reader = csv.reader(file, delimiter=delimiter)
+        try:
+            for row in reader:
+                yield RuntimeResult(row)
+        except csv.Error as error:
+            yield RuntimeResult(None, ValueError(f"Cannot read line {reader.line_num} of '{path}': {error}", 99)) # unexpected
+
+def rows(arguments):
+    # rows: path; separator gives a sequence with an array of strings per line
+    rt = separator("rows", arguments)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    path, delimiter = arguments[0].value, rt.result
+    def converted():
+        for rt in read_rows(path, delimiter):
+            if not rt.error:
+                rt = RuntimeResult(v.Array([v.String(field) for field in rt.result]))
+
+            yield rt
+
+    return RuntimeResult(v.Sequence(converted))
+
+def column(fields):
+    # whole numbers, then any numbers, are packed; anything else stays an array of strings
+    for typecode, number in (("q", int), ("d", float)):
+        try:
+            return v.create_number_array(array(typecode, map(number, fields)))
+        except (builtins.ValueError, OverflowError):
+            pass
+
+    return v.Array(list(map(v.String, fields)))
+
+def columns(arguments):
+    # columns: path; separator reads a file with a header line into a dictionary of columns
+    rt = separator("columns", arguments)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    # the whole file is read and turned into columns at once, which leaves
+    # nothing for the cycle collector to find while it would keep running
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        return read_columns(arguments[0].value, rt.result)
+    finally:
+        if collecting:
+            gc.enable()
+
+def read_columns(path, delimiter):
+    try:
+        with open(path, newline="", encoding="utf-8", errors="replace") as file:
+            reader = csv.reader(file, delimiter=delimiter)
+            names = next(reader, None)
+            rows = list(reader)
+    except OSError as error:
+        return RuntimeResult(None, ValueError(f"Cannot read '{path}': {error.strerror}", 99)) # unexpected
+    except csv.Error as error:
+        return RuntimeResult(None, ValueError(f"Cannot read line {reader.line_num} of '{path}': {error}", 99)) # unexpected
+
+    if names is None:
+        return RuntimeResult(None, ValueError(f"Expected a header line in '{path}'", 99)) # unexpected
+
+    for row in rows:
+        if len(row) != len(names):
+            return RuntimeResult(None, ValueError(f"Expected {len(names)} fields on every line of '{path}', got {len(row)}", 99)) # unexpected
+
+    fields = zip(*rows) if rows else [()] * len(names)
+    return RuntimeResult(v.Dictionary({name: column(values) for name, values in zip(names, fields)}))
+
+class Encoder:
+    # lets csv.writer write its text into a binary file
+    def __init__(self, handle):
+        self.handle = handle
+
+    def write(self, text):
+        self.handle.write(text.encode("utf-8"))
+
+def write(arguments):
+    # write: file; row writes one line, strings as they are and anything else as show prints it
+    file, row = arguments
+    if file.mode == "read":
+        return file_functions.file_error("write", file, None)
+
+    try:
+        csv.writer(Encoder(file.value)).writerow([field.value if field.type.type == "string" else field.__repr__() for field in row])
+    except (OSError, builtins.ValueError) as error:
+        return file_functions.file_error("write", file, error)
+
+    return RuntimeResult(None)
+
+def module():
+    module = v.Module("csv")
+    file = ("file",)
+    module.assign("rows", v.NativeFunction("rows", rows, None, (v.STRING,)))
+    module.assign("columns", v.NativeFunction("columns", columns, None, (v.STRING,)))
+    module.assign("open", v.NativeFunction("open", file_functions.open_, None, (v.STRING,)))
+    module.assign("write", v.NativeFunction("write", write, 2, (file, v.ARRAY)))
+    module.assign("flush", v.NativeFunction("flush", file_functions.flush, 1, (file,)))
+    module.assign("close", v.NativeFunction("close", file_functions.close, 1, (file,)))
+    return module
@@ -0,0 +1,162 @@
+import builtins
+import mmap
+from ..errors import RuntimeResult, ValueError, ArgumentError
+import flu.runtime.values as v
+
+# the file module, loaded with `get: module file`; files are read and written through
+# a buffered binary handle, so scanning a file of any size only ever holds one line
+# or one chunk, and writes are batched until the buffer fills or flush is called
+
+BUFFER_SIZE = 1 << 20
+MODES = {"read": "rb", "write": "wb", "append": "ab"}
+
+def file_error(action, file, error):
+    if isinstance(error, OSError) and error.strerror:
+        return RuntimeResult(None, ValueError(f"Cannot {action} '{file.path}': {error.strerror}", 99)) # unexpected
+
+    # reading a file opened for writing, or using a closed file
+    return RuntimeResult(None, ValueError(f"Cannot {action} '{file.path}', it is {'closed' if file.value.closed else f'open to {file.mode}'}", 99)) # unexpected
+
+def open_(arguments):
+    # open: path; mode, where mode is read (the default), write or append
+    if len(arguments) not in (1, 2):
+        return RuntimeResult(None, ArgumentError(f"Expected 1 or 2 arguments in open, got {len(arguments)}", 39))
+
+    path = arguments[0].value
+    mode = arguments[1].value if len(arguments) == 2 else "read"
+    if mode not in MODES:
+        return RuntimeResult(None, ValueError(f"Expected read, write or append as the mode in open, got {mode}", 99)) # unexpected
+
+    try:
+        return RuntimeResult(v.File(path, open(path, MODES[mode], buffering=BUFFER_SIZE), mode))
+    except OSError as error:
+        return RuntimeResult(None, ValueError(f"Cannot open '{path}': {error.strerror}", 99)) # unexpected
+
+def close(arguments):
+    file = arguments[0]
+    try:
+        file.value.close()
+    except OSError as error:
+        return file_error("close", file, error)
+
+    return RuntimeResult(None)
+
+def readline(arguments):
+    # the next line without its line break, or null at the end of the file
+    file = arguments[0]
+    try:
+        line = file.value.readline()
+    except (OSError, builtins.ValueError) as error:
+        return file_error("read", file, error)
+
+    if not line:
+        return RuntimeResult(None)
+
+    return RuntimeResult(line.decode("utf-8", "replace").rstrip("\r\n"))
+
+def lines(arguments):
+    # the rest of the file a line at a time, as a sequence
+    file = arguments[0]
+    if file.value.closed or file.mode != "read":
+        return file_error("read", file, None)
+
+    return RuntimeResult(v.Sequence(file.lines))
+
+def read(arguments):
+    # read: file; count gives the next count bytes, fewer at the end and none after it
+    file, count = arguments[0], arguments[1].value
+    if count % 1 != 0 or count < 0:
+        return RuntimeResult(None, ValueError(f"Expected a whole number of at least 0 in read, got {arguments[1].__repr__()}", 99)) # unexpected
+
+    try:
+        return RuntimeResult(file.value.read(int(count)))
+    except (OSError, builtins.ValueError) as error:
+        return file_error("read", file, error)
+
+def chunks(arguments):
+    # the rest of the file as a sequence of bytes of the given size
+    file, size = arguments[0], arguments[1].value
+    if size % 1 != 0 or size < 1:
+        return RuntimeResult(None, ValueError(f"Expected a whole number of at least 1 in chunks, got {arguments[1].__repr__()}", 99)) # unexpected
+
+    if file.value.closed or file.mode != "read":
+        return file_error("read", file, None)
+
+    def chunked():
+        try:
+            while chunk := file.value.read(int(size)):
+                yield RuntimeResult(v.Bytes(chunk))
+        except (OSError, builtins.ValueError) as error:
+            yield file_error("read", file, error)
+
+    return RuntimeResult(v.Sequence(chunked))
+
+def seek(arguments):
+    # seek: file; position moves to a byte position, 1 being the start of the file
+    file, position = arguments[0], arguments[1].value
+    if position % 1 != 0 or position < 1:
+        return RuntimeResult(None, ValueError(f"Expected a whole number of at least 1 in seek, got {arguments[1].__repr__()}", 99)) # unexpected
+
+    try:
+        file.value.seek(int(position) - 1)
+    except (OSError, builtins.ValueError) as error:
+        return file_error("seek in", file, error)
+
+    return RuntimeResult(None)
+
+def write(arguments):
+    # write: file; value; ... writes strings and bytes as they are and anything else as show prints it
+    if len(arguments) < 2:
+        return RuntimeResult(None, ArgumentError(f"Expected at least 2 arguments in write, got {len(arguments)}", 39))
+
+    file = arguments[0]
+    try:
+        for argument in arguments[1:]:
+            match argument.type.type:
+                case "bytes":
+                    file.value.write(argument.value)
+                case "string":
+                    file.value.write(argument.value.encode("utf-8"))
+                case _:
+                    file.value.write(argument.__repr__().encode("utf-8"))
+    except (OSError, builtins.ValueError) as error:
+        return file_error("write", file, error)
+
+    return RuntimeResult(None)
+
+def flush(arguments):
+    file = arguments[0]
+    try:
+        file.value.flush()
+    except (OSError, builtins.ValueError) as error:
+        return file_error("write", file, error)
+
+    return RuntimeResult(None)
+
+def map_(arguments):
+    # the whole file as bytes backed by the page cache, read only as it is indexed or sliced
+    path = arguments[0].value
+    try:
+        with open(path, "rb") as file:
+            if not file.seek(0, 2):
+                # an empty file cannot be mapped
+                return RuntimeResult(b"")
+
+            return RuntimeResult(v.Bytes(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)))
+    except OSError as error:
+        return RuntimeResult(None, ValueError(f"Cannot map '{path}': {error.strerror}", 99)) # unexpected
+
+def module():
+    module = v.Module("file")
+    file = ("file",)
+    module.assign("open", v.NativeFunction("open", open_, None, (v.STRING,)))
+    module.assign("close", v.NativeFunction("close", close, 1, (file,)))
+    module.assign("readline", v.NativeFunction("readline", readline, 1, (file,)))
+    module.assign("lines", v.NativeFunction("lines", lines, 1, (file,)))
+    module.assign("read", v.NativeFunction("read", read, 2, (file, v.NUMBER)))
+    module.assign("chunks", v.NativeFunction("chunks", chunks, 2, (file, v.NUMBER)))
+    module.assign("seek", v.NativeFunction("seek", seek, 2, (file, v.NUMBER)))
+    module.assign("write", v.NativeFunction("write", write, None, (file, None)))
+    module.assign("flush", v.NativeFunction("flush", flush, 1, (file,)))
+    module.assign("map", v.NativeFunction("map", map_, 1, (v.STRING,)))
+    return module
@@ -2,13 +2,59 @@ from ..errors import *
 import flu.runtime.values as v
 from ..frontend.lexer import tokenize
 from ..frontend.parser import Parser
+from ..frontend.optimizer import optimize
 import sys
+import math
+import importlib
 import flu.runtime.builtin_functions
+import flu.runtime.vector as vector
 
 sys.setrecursionlimit(10**9)
 
 FILE_EXTENSION = None
 
+# calls to functions the optimizer proved pure are cached
+MEMOISE = True
+MEMO_CACHE_SIZE = 65536
+
+# calls of defined functions in progress, in either evaluator, may not go deeper than this
+MAX_RECURSION_DEPTH = 100000
+call_depth = 0
+
+# modules written in Python, `get: module strings` loads flu.runtime.string_functions
+NATIVE_MODULES = {
+    "strings": "string_functions",
+    "file": "file_functions",
+    "csv": "csv_functions",
+    "json": "json_functions",
+    "math": "math2",
+    "bench": "bench_functions"
+}
+
+def run(ast_node, environment, return_env=False, explicit_stack=False):
+    # explicit_stack evaluates on a frame stack of its own instead of the Python call stack,
+    # for the whole run, functions called back by builtins included
+    global call_depth
+    call_depth = 0
+    environment.explicit_stack = explicit_stack
+    if explicit_stack:
+        import flu.runtime.stack_interpreter as stack_interpreter
+        return stack_interpreter.evaluate(ast_node, environment, False, False, return_env)
+
+    return evaluate(ast_node, environment, False, False, return_env)
+
+def enter_call(function):
+    global call_depth
+    if call_depth >= MAX_RECURSION_DEPTH:
+        return RuntimeResult(None, RecursionError(f"Maximum recursion depth of {MAX_RECURSION_DEPTH} exceeded in {function.name}", 99)) # unexpected
+
+    call_depth += 1
+    return RuntimeResult(None)
+
+def leave_call():
+    global call_depth
+    call_depth -= 1
+
 def evaluate_program(ast_node, environment, in_function, in_loop, return_env):
     last_evaluated = None
     for statement in ast_node.body:
@@ -89,6 +135,42 @@ def evaluate(ast_node, environment, in_function, in_loop, return_env):
             if return_env:
                 return RuntimeResult((rt.result, environment))
             
+            return RuntimeResult(rt.result)
+        case "SliceExpression":
+            rt = evaluate_slice_expression(ast_node, environment, in_function, in_loop, return_env)
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+            
+            if return_env:
+                return RuntimeResult((rt.result, environment))
+            
+            return RuntimeResult(rt.result)
+        case "FieldExpression":
+            rt = evaluate_field_expression(ast_node, environment, in_function, in_loop, return_env)
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+            
+            if return_env:
+                return RuntimeResult((rt.result, environment))
+            
+            return RuntimeResult(rt.result)
+        case "DictionaryLiteral":
+            rt = evaluate_dictionary_literal(ast_node, environment, in_function, in_loop, return_env)
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+            
+            if return_env:
+                return RuntimeResult((rt.result, environment))
+            
+            return RuntimeResult(rt.result)
+        case "SetLiteral":
+            rt = evaluate_set_literal(ast_node, environment, in_function, in_loop, return_env)
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+            
+            if return_env:
+                return RuntimeResult((rt.result, environment))
+            
             return RuntimeResult(rt.result)
         case "CallExpression":
             rt = evaluate_call_expression(ast_node, environment, in_function, in_loop, return_env)
@@ -98,6 +180,15 @@ def evaluate(ast_node, environment, in_function, in_loop, return_env):
             if return_env:
                 return RuntimeResult((rt.result, environment))
             
+            return RuntimeResult(rt.result)
+        case "UncheckedIndexExpression":
+            rt = evaluate_unchecked_index_expression(ast_node, environment, in_function, in_loop, return_env)
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+            
+            if return_env:
+                return RuntimeResult((rt.result, environment))
+            
             return RuntimeResult(rt.result)
         case "UnaryExpression":
             rt = evaluate_unary_expression(ast_node, environment, in_function, in_loop, return_env)
@@ -161,6 +252,15 @@ def evaluate(ast_node, environment, in_function, in_loop, return_env):
             if return_env:
                 return RuntimeResult((rt.result, environment))
             
+            return RuntimeResult(rt.result)
+        case "JumpTableStatement":
+            rt = evaluate_jump_table_statement(ast_node, environment, in_function, in_loop, return_env)
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+            
+            if return_env:
+                return RuntimeResult((rt.result, environment))
+            
             return RuntimeResult(rt.result)
         case "FunctionDeclarationStatement":
             rt = evaluate_function_declaration_statement(ast_node, environment, in_function, in_loop, return_env)
@@ -170,6 +270,15 @@ def evaluate(ast_node, environment, in_function, in_loop, return_env):
             if return_env:
                 return RuntimeResult((rt.result, environment))
             
+            return RuntimeResult(rt.result)
+        case "RecordDeclarationStatement":
+            rt = evaluate_record_declaration_statement(ast_node, environment, in_function, in_loop, return_env)
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+            
+            if return_env:
+                return RuntimeResult((rt.result, environment))
+            
             return RuntimeResult(rt.result)
         case "ReturnStatement":
             rt = evaluate_return_statement(ast_node, environment, in_function, in_loop, return_env)
@@ -188,6 +297,24 @@ def evaluate(ast_node, environment, in_function, in_loop, return_env):
             if return_env:
                 return RuntimeResult((rt.result, environment))
             
+            return RuntimeResult(rt.result)
+        case "ForStatement":
+            rt = evaluate_for_statement(ast_node, environment, in_function, in_loop, return_env)
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+            
+            if return_env:
+                return RuntimeResult((rt.result, environment))
+            
+            return RuntimeResult(rt.result)
+        case "ForEachStatement":
+            rt = evaluate_for_each_statement(ast_node, environment, in_function, in_loop, return_env)
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+            
+            if return_env:
+                return RuntimeResult((rt.result, environment))
+            
             return RuntimeResult(rt.result)
         case "StopStatement":
             rt = evaluate_stop_statement(ast_node, environment, in_function, in_loop, return_env)
@@ -257,86 +384,122 @@ def evaluate_update_statement(ast_node, environment, in_function, in_loop, retur
             if rt.error:
                 return RuntimeResult(None, rt.error)
 
-            if rt.result.type.type != "array":
-                return RuntimeResult(None, DataTypeError(f"Expected array, got {rt.result.type.type}"))
+            if rt.result.type.type not in ("array", "matrix", "dictionary"):
+                return RuntimeResult(None, DataTypeError(f"Expected array, matrix or dictionary, got {rt.result.type.type}", 99)) # unexpected
             
-            array = rt.result
-            rt = evaluate(ast_node.identifier.arguments[0], environment, in_function, in_loop, False)
+            collection = rt.result
+            indices = []
+            for argument in ast_node.identifier.arguments:
+                rt = evaluate(argument, environment, in_function, in_loop, False)
+                if rt.error:
+                    return RuntimeResult(None, rt.error)
+                
+                indices += [rt.result]
+
+            rt = evaluate(ast_node.value, environment, in_function, in_loop, False)
             if rt.error:
                 return RuntimeResult(None, rt.error)
             
-            if rt.result.type.type != "number":
-                return RuntimeResult(None, DataTypeError(f"Expected number, got {rt.result.type.type}", 99)) # unexpected
+            return store_element(collection, indices, rt.result)
+        case "FieldExpression":
+            rt = evaluate(ast_node.identifier.record, environment, in_function, in_loop, False)
+            if rt.error:
+                return RuntimeResult(None, rt.error)
             
-            if rt.result.value % 1 > 0:
-                return RuntimeResult(None, ValueError(f"Expected integer, got remainder {rt.result.value % 1}/1", 99)) # unexpected
-
-            if rt.result.value > len(array.value):
-                return RuntimeResult(None, ValueError(f"Expected a number smaller than or equals{len(array)}, got {rt.result.value}", 99)) # unexpected
+            record = rt.result
+            rt = field_slot(ast_node.identifier, record)
+            if rt.error:
+                return RuntimeResult(None, rt.error)
             
-            if rt.result.value < 1:
-                return RuntimeResult(None, ValueError(f"Expected a number larger than 0, got {rt.result.value}", 99)) # unexpected
-
-            index = rt.result.value - 1
+            slot = rt.result
+            rt = evaluate(ast_node.value, environment, in_function, in_loop, False)
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+            
+            record.set(slot, rt.result)
+            return RuntimeResult(None)
+        case "UncheckedIndexExpression":
             rt = evaluate(ast_node.value, environment, in_function, in_loop, False)
             if rt.error:
                 return RuntimeResult(None, rt.error)
             
-            array.value[index] = rt.result
+            array = environment.lookup(ast_node.identifier.array).result
+            index = environment.lookup(ast_node.identifier.index).result
+            array.set(index.value - 1, rt.result)
             return RuntimeResult(None)
 
 def evaluate_get_statement(ast_node, environment, in_function, in_loop, return_env):
     module = ast_node.module
     match module:
         # import module
-        case "math":
-            import flu.runtime.math2 as math2
-            module = v.Module("math")
-            module.assign("sqrt", v.NativeFunction("sqrt", math2.square_root, 1))
-            module.assign("cbrt", v.NativeFunction("cbrt", math2.cube_root, 1))
-            module.assign("pi", v.Number(math2.pi))
-            rt = environment.assign("math", module, True)
+        case _ if module in NATIVE_MODULES:
+            native = importlib.import_module(f"flu.runtime.{NATIVE_MODULES[module]}")
+            rt = environment.assign(module, native.module(), True)
             if rt.error:
                 return RuntimeResult(None, rt.error)
             
             return RuntimeResult(None)
-        case _:
-            code = None
-            extension = None
-            global_environment = v.Environment(FILE_EXTENSION)
-
-            try:
-                with open(f"{module}.flu") as file:
-                    code = file.read()
-                    extension = "flu"
-            except FileNotFoundError:
-                try:
-                    with open(f"{module}.fl") as file:
-                        code = file.read()
-                        extension = "fl"
-                except FileNotFoundError:
-                    return RuntimeResult(None, ModuleError(f"No module named {module}", 99)) # unexpected
-            
-            rt = tokenize(code, extension)
+        case _ if module.startswith("python."):
+            import flu.runtime.python_bridge as python_bridge
+            rt = python_bridge.load(module.removeprefix("python."), environment)
             if rt.error:
                 return RuntimeResult(None, rt.error)
-            
-            parser = Parser(rt.result, extension)
-            rt = parser.produce_ast()
+
+            rt = environment.assign(ast_node.name, rt.result, True)
             if rt.error:
                 return RuntimeResult(None, rt.error)
             
-            rt = evaluate(rt.result, global_environment, in_function, in_loop, True)
+            return RuntimeResult(None)
+        case _:
+            rt = read_module(module, environment)
             if rt.error:
                 return RuntimeResult(None, rt.error)
-            
-            module = v.Module(module)
-            module.table = rt.result[1].table
-            rt = environment.assign(module.name, module, True)
+
+            program, module_environment = rt.result
+            rt = evaluate(program, module_environment, in_function, in_loop, False)
             if rt.error:
                 return RuntimeResult(None, rt.error)
 
-            return RuntimeResult(None)
+            return assign_module(module, module_environment, environment)
+
+def read_module(module, environment):
+    # the program of a module written in Fluentix and the environment it runs in
+    code = None
+    extension = None
+    global_environment = v.Environment(FILE_EXTENSION)
+    global_environment.explicit_stack = environment.explicit_stack
+
+    try:
+        with open(f"{module}.flu") as file:
+            code = file.read()
+            extension = "flu"
+    except FileNotFoundError:
+        try:
+            with open(f"{module}.fl") as file:
+                code = file.read()
+                extension = "fl"
+        except FileNotFoundError:
+            return RuntimeResult(None, ModuleError(f"No module named {module}", 99)) # unexpected
+    
+    rt = tokenize(code, extension)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+    
+    parser = Parser(rt.result, extension)
+    rt = parser.produce_ast()
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+    
+    return RuntimeResult((optimize(rt.result), global_environment))
+
+def assign_module(name, module_environment, environment):
+    module = v.Module(name)
+    module.table = module_environment.table
+    rt = environment.assign(module.name, module, True)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    return RuntimeResult(None)
 
 def evaluate_if_unless_else_statement(ast_node, environment, in_function, in_loop, return_env):
     rt = evaluate(ast_node.condition, environment, in_function, in_loop, False)
@@ -353,14 +516,46 @@ def evaluate_if_unless_else_statement(ast_node, environment, in_function, in_loo
     if not ast_node.next:
         return RuntimeResult(None, rt.error)
     
-    rt = evaluate_if_unless_else_statement(ast_node.next, environment, in_function, in_loop, return_env)
+    rt = evaluate(ast_node.next, environment, in_function, in_loop, False)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+    
+    return RuntimeResult(rt.result)
+
+def evaluate_jump_table_statement(ast_node, environment, in_function, in_loop, return_env):
+    rt = evaluate(ast_node.subject, environment, in_function, in_loop, False)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+    
+    arm = None
+    if rt.result.type.type in ("number", "string", "boolean"):
+        arm = ast_node.table.get((rt.result.type.type, rt.result.value))
+    
+    if arm is not None:
+        rt = evaluate(ast_node.arms[arm], environment, in_function, in_loop, False)
+    elif ast_node.default:
+        rt = evaluate(ast_node.default, environment, in_function, in_loop, False)
+    else:
+        return RuntimeResult(None)
+    
     if rt.error:
         return RuntimeResult(None, rt.error)
     
     return RuntimeResult(rt.result)
 
 def evaluate_function_declaration_statement(ast_node, environment, in_function, in_loop, return_env):
-    environment.assign(ast_node.func_name, v.DefinedFunction(ast_node.func_name, ast_node.body, ast_node.arguments), True)
+    cache = None
+    if MEMOISE and ast_node.pure and ast_node.memoise:
+        cache = v.FunctionCache(MEMO_CACHE_SIZE)
+
+    environment.assign(ast_node.func_name, v.DefinedFunction(ast_node.func_name, ast_node.body, ast_node.arguments, cache, environment), True)
+    return RuntimeResult(None)
+
+def evaluate_record_declaration_statement(ast_node, environment, in_function, in_loop, return_env):
+    rt = environment.assign(ast_node.name, v.RecordType(ast_node.name, ast_node.fields), True)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+    
     return RuntimeResult(None)
 
 def evaluate_return_statement(ast_node, environment, in_function, in_loop, return_env):
@@ -370,7 +565,35 @@ def evaluate_return_statement(ast_node, environment, in_function, in_loop, retur
     
     return RuntimeResult(v.Return(rt.result))
 
+def check_index_guard(guard, environment):
+    rt = evaluate(guard.start, environment, False, False, False)
+    if rt.error or rt.result.type.type != "number" or rt.result.value % 1 != 0 or rt.result.value < 1:
+        return False
+    
+    rt = evaluate(guard.bound, environment, False, False, False)
+    if rt.error or rt.result.type.type != "number":
+        return False
+    
+    bound = rt.result.value
+    for name in guard.arrays:
+        rt = environment.lookup(name)
+        # bytes can be read without checks but not written
+        accepted = ("array",) if name in guard.written else ("array", "bytes")
+        if rt.error or rt.result.type.type not in accepted or len(rt.result) < bound:
+            return False
+    
+    for name in guard.plain_arrays:
+        rt = environment.lookup(name)
+        if rt.error or rt.result.type.type not in ("array", "bytes"):
+            return False
+    
+    return True
+
 def evaluate_until_statement(ast_node, environment, in_function, in_loop, return_env):
+    body = ast_node.body
+    if ast_node.guard and check_index_guard(ast_node.guard, environment):
+        body = ast_node.unchecked_body
+
     while True:
         rt = evaluate(ast_node.condition, environment, in_function, True, False)
         if rt.error:
@@ -379,6 +602,107 @@ def evaluate_until_statement(ast_node, environment, in_function, in_loop, return
         if rt.result.type.type == "boolean" and rt.result.value == "true":
             return RuntimeResult(None)
 
+        rt = evaluate(body, environment, in_function, True, False)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+        
+        if isinstance(rt.result, v.Return):
+            if not in_function:
+                return RuntimeResult(None, ReturnError("Cannot return outside of function", 99)) # unexpected
+
+            return RuntimeResult(rt.result)
+        
+        if isinstance(rt.result, v.Stop):
+            return RuntimeResult(None)
+
+def loop_range(ast_node, start, end, environment):
+    # checks both ends of a counted loop and declares its variable
+    for value in (start, end):
+        if value.type.type != "number":
+            return RuntimeResult(None, DataTypeError(f"Expected number, got {value.type.type}", 99)) # unexpected
+    
+    if start.value % 1 > 0:
+        return RuntimeResult(None, ValueError(f"Expected integer, got remainder {start.value % 1}/1", 99)) # unexpected
+    
+    if ast_node.identifier in environment.table:
+        rt = environment.update(ast_node.identifier, start)
+    else:
+        rt = environment.assign(ast_node.identifier, start, False)
+    
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+    
+    return RuntimeResult(range(int(start.value), math.floor(end.value) + 1))
+
+def evaluate_for_statement(ast_node, environment, in_function, in_loop, return_env):
+    rt = evaluate(ast_node.start, environment, in_function, in_loop, False)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+    
+    start = rt.result
+    rt = evaluate(ast_node.end, environment, in_function, in_loop, False)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+    
+    rt = loop_range(ast_node, start, rt.result, environment)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+    
+    values = rt.result
+    body = ast_node.body
+    if ast_node.guard and check_index_guard(ast_node.guard, environment):
+        body = ast_node.unchecked_body
+    
+    table = environment.table
+    for value in values:
+        table[ast_node.identifier] = v.Number(value)
+        rt = evaluate(body, environment, in_function, True, False)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+        
+        if isinstance(rt.result, v.Return):
+            if not in_function:
+                return RuntimeResult(None, ReturnError("Cannot return outside of function", 99)) # unexpected
+
+            return RuntimeResult(rt.result)
+        
+        if isinstance(rt.result, v.Stop):
+            return RuntimeResult(None)
+    
+    return RuntimeResult(None)
+
+def loop_elements(ast_node, iterable, environment):
+    # starts a pass over what a for-each loop walks and declares its variable
+    rt = v.iterate(iterable)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+    
+    elements = rt.result
+    if ast_node.identifier in environment.table:
+        rt = environment.update(ast_node.identifier, environment.table[ast_node.identifier])
+    else:
+        rt = environment.assign(ast_node.identifier, v.Null(), False)
+    
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+    
+    return RuntimeResult(elements)
+
+def evaluate_for_each_statement(ast_node, environment, in_function, in_loop, return_env):
+    rt = evaluate(ast_node.iterable, environment, in_function, in_loop, False)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+    
+    rt = loop_elements(ast_node, rt.result, environment)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+    
+    table = environment.table
+    for element in rt.result:
+        if element.error:
+            return RuntimeResult(None, element.error)
+        
+        table[ast_node.identifier] = element.result
         rt = evaluate(ast_node.body, environment, in_function, True, False)
         if rt.error:
             return RuntimeResult(None, rt.error)
@@ -391,6 +715,8 @@ def evaluate_until_statement(ast_node, environment, in_function, in_loop, return
         
         if isinstance(rt.result, v.Stop):
             return RuntimeResult(None)
+    
+    return RuntimeResult(None)
 
 def evaluate_stop_statement(ast_node, environment, in_function, in_loop, return_env):
     return RuntimeResult(v.Stop())
@@ -415,37 +741,76 @@ def evaluate_include_statement(ast_node, environment, in_function, in_loop, retu
     if rt.error:
         return RuntimeResult(None, rt.error)
     
-    if rt.result.type.type not in ("array",):
-        return RuntimeResult(None, DataTypeError(f"Expected array, got {rt.result.type.type}"))
-    
-    array = rt.result
+    rt = check_include(rt.result, ast_node.index)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    collection = rt.result
+    index = None
     if ast_node.index:
         rt = evaluate(ast_node.index, environment, in_function, in_loop, False)
         if rt.error:
             return RuntimeResult(None, rt.error)
 
-        if rt.result.type.type != "number":
-            return RuntimeResult(None, DataTypeError(f"Expected number, got {rt.result.type.type}", 99)) # unexpected
-        
-        if rt.result.value % 1 > 0:
-            return RuntimeResult(None, ValueError(f"Expected integer, got remainder {rt.result.value % 1}/1", 99)) # unexpected
+        index = rt.result
 
-        if rt.result.value > len(array.value):
-            return RuntimeResult(None, ValueError(f"Expected a number smaller than or equals{len(array)}, got {rt.result.value}", 99)) # unexpected
-        
-        if rt.result.value < 1:
-            return RuntimeResult(None, ValueError(f"Expected a number larger than 0, got {rt.result.value}", 99)) # unexpected
-
-        index = rt.result.value
-    else:
-        index = len(array.value)
+    rt = include_position(collection, index)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
 
+    position = rt.result
     rt = evaluate(ast_node.element, environment, in_function, in_loop, False)
     if rt.error:
         return RuntimeResult(None, rt.error)
     
-    element = rt.result
-    array.value.insert(index, element)
+    return include_element(collection, position, rt.result)
+
+def check_collection(value):
+    if value.type.type not in ("array", "dictionary", "set"):
+        return RuntimeResult(None, DataTypeError(f"Expected array, dictionary or set, got {value.type.type}", 99)) # unexpected
+
+    return RuntimeResult(value)
+
+def check_include(value, index):
+    rt = check_collection(value)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    if value.type.type == "dictionary" and not index:
+        return RuntimeResult(None, SyntaxError("Expected 'at' and a key to include to a dictionary", 99)) # unexpected
+
+    if value.type.type == "set" and index:
+        return RuntimeResult(None, SyntaxError("Cannot include to a set at a position", 99)) # unexpected
+
+    return RuntimeResult(value)
+
+def include_position(collection, index):
+    # the key or position the element goes to, worked out before the element is evaluated
+    match collection.type.type:
+        case "dictionary":
+            return check_key(index)
+        case "set":
+            return RuntimeResult(None)
+
+    if index is None:
+        return RuntimeResult(len(collection))
+
+    # one past the end appends
+    return check_index(index, len(collection) + 1)
+
+def include_element(collection, position, element):
+    match collection.type.type:
+        case "dictionary":
+            collection.set(position, element)
+        case "set":
+            rt = check_key(element)
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+
+            collection.value.add(rt.result)
+        case _:
+            collection.insert(position, element)
+
     return RuntimeResult(None)
 
 def evaluate_exclude_statement(ast_node, environment, in_function, in_loop, return_env):
@@ -453,30 +818,47 @@ def evaluate_exclude_statement(ast_node, environment, in_function, in_loop, retu
     if rt.error:
         return RuntimeResult(None, rt.error)
     
-    if rt.result.type.type not in ("array",):
-        return RuntimeResult(None, DataTypeError(f"Expected array, got {rt.result.type.type}"))
+    rt = check_collection(rt.result)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
 
-    array = rt.result
+    collection = rt.result
     rt = evaluate(ast_node.index, environment, in_function, in_loop, False)
     if rt.error:
         return RuntimeResult(None, rt.error)
 
-    if rt.result.type.type != "number":
-        return RuntimeResult(None, DataTypeError(f"Expected number, got {rt.result.type.type}", 99)) # unexpected
-    
-    if rt.result.value % 1 > 0:
-        return RuntimeResult(None, ValueError(f"Expected integer, got remainder {rt.result.value % 1}/1", 99)) # unexpected
+    return exclude_element(collection, rt.result)
 
-    if rt.result.value > len(array.value):
-        return RuntimeResult(None, ValueError(f"Expected a number smaller than or equals{len(array)}, got {rt.result.value}", 99)) # unexpected
-    
-    if rt.result.value < 1:
-        return RuntimeResult(None, ValueError(f"Expected a number larger than 0, got {rt.result.value}", 99)) # unexpected
+def exclude_element(collection, index):
+    if collection.type.type == "array":
+        rt = check_array_index(collection, index)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
 
-    index = rt.result.value
-    array.value.pop(index)
+        collection.pop(rt.result)
+        return RuntimeResult(None)
+
+    rt = check_key(index)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    if rt.result not in collection.value:
+        return RuntimeResult(None, ValueError(f"Cannot exclude {v.translate_python_to_fluentix(rt.result).__repr__()} because it is not in the {collection.type.type}", 99)) # unexpected
+
+    if collection.type.type == "set":
+        collection.value.remove(rt.result)
+    else:
+        del collection.value[rt.result]
+    
     return RuntimeResult(None)
 
+def check_key(value):
+    key = v.hash_key(value)
+    if key is None:
+        return RuntimeResult(None, DataTypeError(f"Expected number, string or boolean as a key, got {value.type.type}", 99)) # unexpected
+    
+    return RuntimeResult(key)
+
 def evaluate_identifier(ast_node, environment, in_function, in_loop, return_env):
     rt = environment.lookup(ast_node.symbol)
     if rt.error:
@@ -507,13 +889,108 @@ def evaluate_array_literal(ast_node, environment, in_function, in_loop, return_e
     
     return RuntimeResult(v.Array(array))
 
+def evaluate_slice_expression(ast_node, environment, in_function, in_loop, return_env):
+    values = []
+    for node in (ast_node.array, ast_node.start, ast_node.end):
+        rt = evaluate(node, environment, in_function, in_loop, False)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+        
+        values += [rt.result]
+    
+    return slice_array(*values)
+
+def slice_array(array, start, end):
+    # `a: i to j` is elements i to j inclusive, j = i - 1 gives an empty slice
+    if array.type.type not in ("array", "bytes"):
+        return RuntimeResult(None, DataTypeError(f"Expected array or bytes, got {array.type.type}", 99)) # unexpected
+
+    rt = check_index(start, len(array) + 1)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+    
+    start = rt.result
+    if end.type.type != "number":
+        return RuntimeResult(None, DataTypeError(f"Expected number, got {end.type.type}", 99)) # unexpected
+    
+    if end.value % 1 > 0:
+        return RuntimeResult(None, ValueError(f"Expected integer, got remainder {end.value % 1}/1", 99)) # unexpected
+
+    if not start <= end.value <= len(array):
+        return RuntimeResult(None, ValueError(f"Expected a number from {start + 1} to {len(array)}, or {start} for an empty slice, got {end.value}", 99)) # unexpected
+
+    return RuntimeResult(array.slice(start, int(end.value)))
+
+def evaluate_field_expression(ast_node, environment, in_function, in_loop, return_env):
+    rt = evaluate(ast_node.record, environment, in_function, in_loop, False)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+    
+    record = rt.result
+    rt = field_slot(ast_node, record)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+    
+    return RuntimeResult(record.get(rt.result))
+
+def field_slot(ast_node, record):
+    # where the field sits in the record; the answer is kept on the node, so as long as
+    # the same record type keeps coming through, finding it is a single identity check
+    if record.type.type != "record":
+        return RuntimeResult(None, DataTypeError(f"Expected record, got {record.type.type}", 99)) # unexpected
+    
+    if ast_node.cached_type is not record.record_type:
+        slot = record.record_type.slots.get(ast_node.field)
+        if slot is None:
+            return RuntimeResult(None, VariableError(f"Record {record.record_type.name} has no field {ast_node.field}", 99)) # unexpected
+        
+        ast_node.cached_type = record.record_type
+        ast_node.cached_slot = slot
+    
+    return RuntimeResult(ast_node.cached_slot)
+
+def evaluate_dictionary_literal(ast_node, environment, in_function, in_loop, return_env):
+    dictionary = {}
+    for key, value in zip(ast_node.keys, ast_node.values):
+        rt = evaluate(key, environment, in_function, in_loop, False)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+        
+        rt = check_key(rt.result)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+        
+        key = rt.result
+        rt = evaluate(value, environment, in_function, in_loop, False)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+        
+        dictionary[key] = rt.result
+    
+    return RuntimeResult(v.Dictionary(dictionary))
+
+def evaluate_set_literal(ast_node, environment, in_function, in_loop, return_env):
+    elements = set()
+    for element in ast_node.value:
+        rt = evaluate(element, environment, in_function, in_loop, False)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+        
+        rt = check_key(rt.result)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+        
+        elements.add(rt.result)
+    
+    return RuntimeResult(v.Set(elements))
+
 def evaluate_call_expression(ast_node, environment, in_function, in_loop, return_env):
     rt = evaluate(ast_node.callee, environment, in_function, in_loop, False)
     if rt.error:
         return RuntimeResult(None, rt.error)
     
-    if rt.result.type.type not in ("native function", "defined function", "module", "array"):
-        return RuntimeResult(None, DataTypeError(f"Expected native function, defined function, array or module, got {rt.result.type.type}", 5))
+    if rt.result.type.type not in ("native function", "defined function", "record type", "module", "python object", "array", "matrix", "dictionary", "bytes"):
+        return RuntimeResult(None, DataTypeError(f"Expected native function, defined function, record type, array, matrix, dictionary, bytes, module or python object, got {rt.result.type.type}", 5))
     
     match rt.result.type.type:
         case "native function":
@@ -524,13 +1001,9 @@ def evaluate_call_expression(ast_node, environment, in_function, in_loop, return
                 if rt.error:
                     return RuntimeResult(None, rt.error)
                 
-                arguments += [v.translate_fluentix_to_python(rt.result)]
+                arguments += [rt.result]
 
-            rt = callee.call(arguments)
-            if rt.error:
-                return RuntimeResult(None, rt.error)
-            
-            return RuntimeResult(v.translate_python_to_fluentix(rt.result))
+            return callee.call(arguments)
         case "defined function":
             callee = rt.result
             arguments = []
@@ -546,65 +1019,204 @@ def evaluate_call_expression(ast_node, environment, in_function, in_loop, return
                 return RuntimeResult(None, rt.error)
             
             return RuntimeResult(rt.result)
-        case "module":
-            if len(ast_node.arguments) != 1:
-                return RuntimeResult(None, ArgumentError(f"Expected 1 function in '{rt.result.name}', got {len(ast_node.arguments)}/1", 99)) # unexpected
+        case "record type":
+            callee = rt.result
+            values = []
+            for argument in ast_node.arguments:
+                rt = evaluate(argument, environment, in_function, in_loop, False)
+                if rt.error:
+                    return RuntimeResult(None, rt.error)
 
-            rt = environment.lookup(rt.result.name)
-            if rt.error:
-                return RuntimeResult(None, rt.error)
+                values += [rt.result]
+            
+            return callee.create(values)
+        case "module" | "python object":
+            module = rt.result
+            if len(ast_node.arguments) != 1:
+                return RuntimeResult(None, ArgumentError(f"Expected 1 function in '{module.name}', got {len(ast_node.arguments)}/1", 99)) # unexpected
 
-            match ast_node.arguments[0].kind.type:
+            member = ast_node.arguments[0]
+            match member.kind.type:
                 case "CallExpression":
-                    rt = evaluate_call_expression(ast_node.arguments[0], rt.result, in_function, in_loop, False)
-                    if rt.error:
-                        return RuntimeResult(None, rt.error)
-                    
-                    return RuntimeResult(rt.result)
-                case "Identifier":
-                    rt = evaluate_identifier(ast_node.arguments[0], rt.result, in_function, in_loop, False)
+                    if member.callee.kind.type != "Identifier":
+                        return RuntimeResult(None, SyntaxError("Invalid Syntax!", 99)) # unexpected
+
+                    rt = module.lookup(member.callee.symbol)
                     if rt.error:
                         return RuntimeResult(None, rt.error)
 
-                    return RuntimeResult(rt.result)
+                    return call_module_member(rt.result, member, environment, in_function, in_loop)
+                case "Identifier":
+                    return module.lookup(member.symbol)
                 case _:
                     return RuntimeResult(None, SyntaxError("Invalid Syntax!", 99)) # unexpected
-        case "array":
-            array = rt.result
-            if len(ast_node.arguments) != 1:
-                return RuntimeResult(None, ArgumentError(f"Expected 1 number in '{rt.result.callee.symbol}, got {len(ast_node.arguments)}/1", 99)) # unexpected
+        case "array" | "matrix" | "dictionary" | "bytes":
+            collection = rt.result
+            indices = []
+            for argument in ast_node.arguments:
+                rt = evaluate(argument, environment, in_function, in_loop, False)
+                if rt.error:
+                    return RuntimeResult(None, rt.error)
+                
+                indices += [rt.result]
 
-            rt = evaluate(ast_node.arguments[0], environment, in_function, in_loop, False)
-            if rt.error:
-                return RuntimeResult(None, rt.error)
-            
-            if rt.result.type.type != "number":
-                return RuntimeResult(None, DataTypeError(f"Expected number, got {rt.result.type.type}", 99)) # unexpected
-            
-            if rt.result.value % 1 > 0:
-                return RuntimeResult(None, ValueError(f"Expected integer, got remainder {rt.result.value % 1}/1", 99)) # unexpected
+            return load_element(collection, indices)
 
-            if rt.result.value > len(array.value):
-                return RuntimeResult(None, ValueError(f"Expected a number smaller than or equals to {len(array.value)}, got {rt.result.value}", 99)) # unexpected
-            
-            if rt.result.value < 1:
-                return RuntimeResult(None, ValueError(f"Expected a number larger than 0, got {rt.result.value}", 99)) # unexpected
+def call_module_member(callee, ast_node, environment, in_function, in_loop):
+    # only the function comes from the module, its arguments are evaluated where the call is
+    arguments = []
+    for argument in ast_node.arguments:
+        rt = evaluate(argument, environment, in_function, in_loop, False)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        arguments += [rt.result]
+
+    match callee.type.type:
+        case "native function":
+            return callee.call(arguments)
+        case "defined function":
+            # a function from a module file runs in that file's global scope
+            return callee.call(arguments, callee.environment, in_loop)
+        case "record type":
+            return callee.create(arguments)
+
+    return RuntimeResult(None, DataTypeError(f"Expected native function, defined function or record type, got {callee.type.type}", 5))
+
+def check_array_index(array, index):
+    return check_index(index, len(array))
+
+def check_index(index, length):
+    # turns a 1-based Fluentix index into a Python one
+    if index.type.type != "number":
+        return RuntimeResult(None, DataTypeError(f"Expected number, got {index.type.type}", 99)) # unexpected
+    
+    if index.value % 1 > 0:
+        return RuntimeResult(None, ValueError(f"Expected integer, got remainder {index.value % 1}/1", 99)) # unexpected
+
+    if index.value > length:
+        return RuntimeResult(None, ValueError(f"Expected a number smaller than or equals to {length}, got {index.value}", 99)) # unexpected
+    
+    if index.value < 1:
+        return RuntimeResult(None, ValueError(f"Expected a number larger than 0, got {index.value}", 99)) # unexpected
+
+    return RuntimeResult(int(index.value) - 1)
+
+def check_matrix_index(matrix, indices):
+    # `M: i` selects a row, `M: i; j` a single element; a row or column view
+    # is indexed like an array, so `R: j` is an element
+    if len(indices) == 1 and isinstance(matrix, v.MatrixVector):
+        rt = check_index(indices[0], matrix.columns if matrix.rows == 1 else matrix.rows)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        return RuntimeResult(list(matrix.element(rt.result)))
+
+    if len(indices) not in (1, 2):
+        return RuntimeResult(None, ArgumentError(f"Expected 1 or 2 numbers in matrix, got {len(indices)}/2", 99)) # unexpected
+    
+
+    rt = check_index(indices[0], matrix.rows)
+    if rt.error or len(indices) == 1:
+        return RuntimeResult([rt.result], rt.error)
+    
+    row = rt.result
+    rt = check_index(indices[1], matrix.columns)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    return RuntimeResult([row, rt.result])
+
+def check_dictionary_key(dictionary, indices):
+    if len(indices) != 1:
+        return RuntimeResult(None, ArgumentError(f"Expected 1 key in dictionary, got {len(indices)}/1", 99)) # unexpected
+
+    return check_key(indices[0])
+
+def load_element(collection, indices):
+    if collection.type.type == "dictionary":
+        rt = check_dictionary_key(collection, indices)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+        
+        if rt.result not in collection.value:
+            return RuntimeResult(None, ValueError(f"Key {indices[0].__repr__()} does not exist in the dictionary", 99)) # unexpected
+
+        return RuntimeResult(collection.get(rt.result))
+
+    if collection.type.type == "matrix":
+        rt = check_matrix_index(collection, indices)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+        
+        if len(rt.result) == 1:
+            return RuntimeResult(collection.row(rt.result[0]))
+        
+        return RuntimeResult(collection.get(*rt.result))
+
+    if len(indices) != 1:
+        return RuntimeResult(None, ArgumentError(f"Expected 1 number in array, got {len(indices)}/1", 99)) # unexpected
+
+    rt = check_array_index(collection, indices[0])
+    if rt.error:
+        return RuntimeResult(None, rt.error)
 
-            return RuntimeResult(array.value[rt.result.value-1])
+    return RuntimeResult(collection.get(rt.result))
+
+def store_element(collection, indices, value):
+    if collection.type.type == "dictionary":
+        rt = check_dictionary_key(collection, indices)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+        
+        collection.set(rt.result, value)
+        return RuntimeResult(None)
+
+    if collection.type.type == "matrix":
+        if value.type.type != "number":
+            return RuntimeResult(None, DataTypeError(f"Expected number, got {value.type.type}", 99)) # unexpected
+
+        rt = check_matrix_index(collection, indices)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+        
+        if len(rt.result) != 2:
+            return RuntimeResult(None, ArgumentError(f"Expected 2 numbers in matrix, got {len(indices)}/2", 99)) # unexpected
+        
+        collection.set(*rt.result, value.value)
+        return RuntimeResult(None)
+
+    if len(indices) != 1:
+        return RuntimeResult(None, ArgumentError(f"Expected 1 number in array, got {len(indices)}/1", 99)) # unexpected
+
+    rt = check_array_index(collection, indices[0])
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    collection.set(rt.result, value)
+    return RuntimeResult(None)
+
+def evaluate_unchecked_index_expression(ast_node, environment, in_function, in_loop, return_env):
+    array = environment.lookup(ast_node.array).result
+    index = environment.lookup(ast_node.index).result
+    return RuntimeResult(array.get(index.value - 1))
 
 def evaluate_unary_expression(ast_node, environment, in_function, in_loop, return_env):
     rt = evaluate(ast_node.value, environment, in_function, in_loop, False)
     if rt.error:
         return RuntimeResult(None, rt.error)
     
-    match rt.result.type.type:
+    return unary_operation(ast_node.sign, rt.result)
+
+def unary_operation(sign, value):
+    match value.type.type:
         case "number":
-            if ast_node.sign == "-":
-                return RuntimeResult(v.create_number(-rt.result.value))
+            if sign == "-":
+                return RuntimeResult(v.create_number(-value.value))
             
-            return RuntimeResult(rt.result)
+            return RuntimeResult(value)
         case _:
-            return RuntimeResult(None, DataTypeError(f"Unexpected unary operation for '{rt.result.type.type}'", 2))
+            return RuntimeResult(None, DataTypeError(f"Unexpected unary operation for '{value.type.type}'", 2))
 
 def evaluate_binary_expression(ast_node, environment, in_function, in_loop, return_env):
     rt = evaluate(ast_node.left, environment, in_function, in_loop, False)
@@ -618,8 +1230,13 @@ def evaluate_binary_expression(ast_node, environment, in_function, in_loop, retu
         return RuntimeResult(None, rt.error)
     
     right = rt.result
+    return binary_operation(ast_node.operator, left, right)
+
+def binary_operation(operator, left, right):
+    if vector.is_vector_operation(left, right):
+        return vector.binary_operation(operator, left, right)
 
-    match ast_node.operator:
+    match operator:
         case "Plus":
             match left.type.type:
                 case "number":
@@ -631,7 +1248,12 @@ def evaluate_binary_expression(ast_node, environment, in_function, in_loop, retu
                     if right.type.type != "string":
                         return RuntimeResult(None, DataTypeError(f"Unexpected operation between number and {right.type.type}", 99)) # unexpected
                     
-                    return RuntimeResult(v.String(left.value + right.value))
+                    return RuntimeResult(left.concat(right))
+                case "bytes":
+                    if right.type.type != "bytes":
+                        return RuntimeResult(None, DataTypeError(f"Unexpected operation between bytes and {right.type.type}", 99)) # unexpected
+                    
+                    return RuntimeResult(v.Bytes(b"".join((left.value, right.value))))
                 case _:
                     return RuntimeResult(None, DataTypeError(f"Unexpected operation between {left.type.type} and {right.type.type}", 7))
         case "Minus":
@@ -658,6 +1280,32 @@ def evaluate_binary_expression(ast_node, environment, in_function, in_loop, retu
             
             return RuntimeResult(v.create_number(left.value ** right.value))
 
+def contains(collection, element):
+    match collection.type.type:
+        case "dictionary" | "set":
+            key = v.hash_key(element)
+            return RuntimeResult(key is not None and key in collection.value)
+        case "array":
+            if collection.packed and element.type.type == "number":
+                return RuntimeResult(element.value in collection.storage())
+
+            return RuntimeResult(any(v.values_equal(element, other) for other in collection))
+        case "string":
+            if element.type.type != "string":
+                return RuntimeResult(None, DataTypeError(f"Expected string, got {element.type.type}", 99)) # unexpected
+
+            return RuntimeResult(element.value in collection.value)
+        case "bytes":
+            if element.type.type == "bytes":
+                return RuntimeResult(collection.find(element.value))
+            
+            if element.type.type == "number":
+                return RuntimeResult(element.value in range(256) and collection.find(bytes([element.value])))
+
+            return RuntimeResult(None, DataTypeError(f"Expected bytes or number, got {element.type.type}", 99)) # unexpected
+
+    return RuntimeResult(None, DataTypeError(f"Expected array, dictionary, set, string or bytes, got {collection.type.type}", 99)) # unexpected
+
 def evaluate_comparison_expression(ast_node, environment, in_function, in_loop, return_env):
     rt = evaluate(ast_node.left, environment, in_function, in_loop, False)
     if rt.error:
@@ -670,24 +1318,29 @@ def evaluate_comparison_expression(ast_node, environment, in_function, in_loop,
         return RuntimeResult(None, rt.error)
     
     right = rt.result
+    return comparison_operation(ast_node.operator, left, right)
+
+def comparison_operation(operator, left, right):
+    if operator in vector.COMPARISON and vector.is_vector_operation(left, right):
+        return vector.comparison_operation(operator, left, right)
 
-    match ast_node.operator:
+    match operator:
         case "Equals":
-            if left.type.type != right.type.type:
-                return RuntimeResult(v.Boolean("false"))
-            
-            if left.value == right.value:
+            if v.values_equal(left, right):
                 return RuntimeResult(v.Boolean("true"))
             
             return RuntimeResult(v.Boolean("false"))
         case "NotEquals":
-            if left.type.type != right.type.type:
-                return RuntimeResult(v.Boolean("true"))
-            
-            if left.value != right.value:
+            if not v.values_equal(left, right):
                 return RuntimeResult(v.Boolean("true"))
             
             return RuntimeResult(v.Boolean("false"))
+        case "In":
+            rt = contains(right, left)
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+
+            return RuntimeResult(v.Boolean("true" if rt.result else "false"))
         case "GreaterThan":
             match left.type.type:
                 case "number":
@@ -0,0 +1,98 @@
+import builtins
+import json
+from ..errors import RuntimeResult, ValueError
+import flu.runtime.values as v
+import flu.runtime.file_functions as file_functions
+
+# the json module, loaded with `get: module json`; decoding and encoding are done by
+# Python's json module, and a JSON-lines file is read one value at a time
+
+def plain(value):
+    # called by the encoder for each Fluentix value it meets, one level at a time
+    match value.type.type:
+        case "number" | "string":
+            return value.value
+        case "boolean":
+            return value.value == "true"
+        case "null":
+            return None
+        case "array":
+            return value.to_python() if value.packed else list(value)
+        case "dictionary":
+            # object keys are strings in JSON, so true is written as Python would write True
+            return {str(key) if isinstance(key, v.BooleanKey) else key: element for key, element in value.value.items()}
+        case "set":
+            return list(map(v.python_key, value.value))
+        case "record":
+            return {field: value.get(slot) for slot, field in enumerate(value.record_type.fields)}
+
+    raise TypeError(value.type.type)
+
+def encode(value):
+    try:
+        return RuntimeResult(json.dumps(value, default=plain, ensure_ascii=False))
+    except TypeError as error:
+        return RuntimeResult(None, ValueError(f"Cannot write {error.args[0]} as JSON", 99)) # unexpected
+    except builtins.ValueError:
+        return RuntimeResult(None, ValueError("Cannot write a value that contains itself as JSON", 99)) # unexpected
+
+def decode(text, where):
+    try:
+        return RuntimeResult(v.translate_python_to_fluentix(json.loads(text)))
+    except json.JSONDecodeError as error:
+        return RuntimeResult(None, ValueError(f"Invalid JSON {where}: {error.msg} at character {error.pos + 1}", 99)) # unexpected
+
+def parse(arguments):
+    return decode(arguments[0].value, "in parse")
+
+def format_(arguments):
+    return encode(arguments[0])
+
+def read_lines(path):
+    try:
+        file = open(path, "rb")
+    except OSError as error:
+        yield RuntimeResult(None, ValueError(f"Cannot read '{path}': {error.strerror}", 99)) # unexpected
+        return
+
+    with file:
+        for number, line in enumerate(file, 1):
+            if line.strip():
+                rt = decode(line, f"on line {number} of '{path}'")
+                yield rt
+                if rt.error:
+                    return
+
+def lines(arguments):
+    # lines: path gives a sequence with the value on each line of a JSON-lines file
+    path = arguments[0].value
+    return RuntimeResult(v.Sequence(lambda: read_lines(path)))
+
+def write(arguments):
+    # write: file; value writes the value as one JSON line
+    file = arguments[0]
+    if file.mode == "read":
+        return file_functions.file_error("write", file, None)
+
+    rt = encode(arguments[1])
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    try:
+        file.value.write(rt.result.encode("utf-8") + b"\n")
+    except (OSError, builtins.ValueError) as error:
+        return file_functions.file_error("write", file, error)
+
+    return RuntimeResult(None)
+
+def module():
+    module = v.Module("json")
+    file = ("file",)
+    module.assign("parse", v.NativeFunction("parse", parse, 1, (v.STRING,)))
+    module.assign("format", v.NativeFunction("format", format_, 1))
+    module.assign("lines", v.NativeFunction("lines", lines, 1, (v.STRING,)))
+    module.assign("open", v.NativeFunction("open", file_functions.open_, None, (v.STRING,)))
+    module.assign("write", v.NativeFunction("write", write, 2, (file, None)))
+    module.assign("flush", v.NativeFunction("flush", file_functions.flush, 1, (file,)))
+    module.assign("close", v.NativeFunction("close", file_functions.close, 1, (file,)))
+    return module
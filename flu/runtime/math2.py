@@ -1,13 +1,157 @@
-from ..errors import RuntimeResult, MathError
+from ..errors import RuntimeResult, MathError, DataTypeError, ValueError, ArgumentError
+from itertools import repeat
+import builtins
 import math
+import flu.runtime.values as v
+import flu.runtime.vector as vector
 
-def square_root(arguments):
-    if arguments[0] < 0:
-        return RuntimeResult(None, MathError("Can't get square root of a negative number", 99)) # unexpected
-    
-    return RuntimeResult(math.sqrt(arguments[0]))
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
-def cube_root(arguments):
-    return RuntimeResult(arguments[0] ** (1/3))
+# the math module, loaded with `get: module math`; every function takes numbers or arrays
+# of numbers, and an array is worked on in one batched call, by NumPy once it is large enough
 
-pi = math.pi
\ No newline at end of file
+def cube_root(x):
+    return math.copysign(abs(x) ** (1 / 3), x)
+
+def round_half_up(x):
+    # halves go away from zero, like rounding by hand
+    return int(math.copysign(math.floor(abs(x) + 0.5), x)) if math.isfinite(x) else x
+
+def whole(function):
+    # integer functions take whole numbers only, 3.0 counting as 3
+    def checked(*numbers):
+        if any(number % 1 != 0 for number in numbers):
+            raise builtins.ValueError
+
+        return function(*[int(number) for number in numbers])
+
+    return checked
+
+def numpy_round(x):
+    return numpy.copysign(numpy.floor(numpy.abs(x) + 0.5), x)
+
+# name: (Python function, number of arguments, NumPy function for large arrays);
+# log takes an optional base as its second argument
+FUNCTIONS = {
+    "sqrt": (math.sqrt, 1, "sqrt"),
+    "cbrt": (getattr(math, "cbrt", cube_root), 1, "cbrt"),
+    "sin": (math.sin, 1, "sin"),
+    "cos": (math.cos, 1, "cos"),
+    "tan": (math.tan, 1, "tan"),
+    "asin": (math.asin, 1, "arcsin"),
+    "acos": (math.acos, 1, "arccos"),
+    "atan": (math.atan, 1, "arctan"),
+    "atan2": (math.atan2, 2, None),
+    "exp": (math.exp, 1, "exp"),
+    "log": (math.log, (1, 2), "log"),
+    "log2": (math.log2, 1, "log2"),
+    "log10": (math.log10, 1, "log10"),
+    "floor": (math.floor, 1, "floor"),
+    "ceil": (math.ceil, 1, "ceil"),
+    "round": (round_half_up, 1, numpy_round),
+    "gcd": (whole(math.gcd), 2, None),
+    "lcm": (whole(math.lcm), 2, None),
+    "powmod": (whole(pow), 3, None),
+    "factorial": (whole(math.factorial), 1, None),
+    "choose": (whole(math.comb), 2, None),
+    "permutations": (whole(math.perm), 2, None)
+}
+
+# results that are always whole numbers, kept as integers when NumPy computed them
+WHOLE_RESULTS = {"floor", "ceil", "round"}
+
+def operands(name, arguments):
+    # the Python numbers behind each argument, a number or a sequence of them
+    result = []
+    for argument in arguments:
+        if argument.type.type == "number":
+            result += [argument.value]
+        elif argument.packed:
+            result += [argument.storage()]
+        else:
+            elements = list(argument)
+            for element in elements:
+                if element.type.type != "number":
+                    return RuntimeResult(None, DataTypeError(f"Expected number in {name}, got {element.type.type}", 99)) # unexpected
+
+            result += [[element.value for element in elements]]
+
+    lengths = sorted({len(operand) for operand in result if not isinstance(operand, (int, float))})
+    if len(lengths) > 1:
+        return RuntimeResult(None, ValueError(f"Expected arrays of the same length in {name}, got {' and '.join(map(str, lengths))}", 99)) # unexpected
+
+    return RuntimeResult(result)
+
+def domain_error(name, function, numbers):
+    # runs the calls again one by one to say which numbers were the problem
+    for arguments in numbers:
+        try:
+            function(*arguments)
+        except (builtins.ValueError, ZeroDivisionError):
+            if name == "sqrt":
+                return RuntimeResult(None, MathError("Can't get square root of a negative number", 99)) # unexpected
+
+            return RuntimeResult(None, MathError(f"Cannot compute {name} of {'; '.join([v.create_number(number).__repr__() for number in arguments])}", 99)) # unexpected
+        except OverflowError:
+            return RuntimeResult(None, MathError(f"Result of {name} is too large", 99)) # unexpected
+
+    return RuntimeResult(None, MathError(f"Cannot compute {name}", 99)) # unexpected
+
+def numpy_apply(name, function, operand):
+    # None when NumPy gave infinities or nans from finite input, Python then reports what went wrong
+    x = numpy.asarray(operand, dtype=numpy.float64)
+    with numpy.errstate(all="ignore"):
+        result = getattr(numpy, function)(x) if isinstance(function, str) else function(x)
+
+    if not numpy.isfinite(result).all() and numpy.isfinite(x).all():
+        return None
+
+    if name in WHOLE_RESULTS and numpy.abs(result).max(initial=0) < vector.NUMPY_INT_LIMIT:
+        return v.create_number_array(result.astype(numpy.int64).tolist())
+
+    return v.create_number_array(result.tolist())
+
+def apply(name, arguments):
+    function, arity, numpy_function = FUNCTIONS[name]
+    if isinstance(arity, tuple) and len(arguments) not in arity:
+        return RuntimeResult(None, ArgumentError(f"Expected {' or '.join(map(str, arity))} arguments in {name}, got {len(arguments)}", 39))
+
+    rt = operands(name, arguments)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    numbers = rt.result
+    if all(isinstance(operand, (int, float)) for operand in numbers):
+        try:
+            return RuntimeResult(v.create_number(function(*numbers)))
+        except (builtins.ValueError, ZeroDivisionError, OverflowError):
+            return domain_error(name, function, [numbers])
+
+    if numpy and numpy_function and len(numbers) == 1 and len(numbers[0]) >= vector.NUMPY_THRESHOLD:
+        result = numpy_apply(name, numpy_function, numbers[0])
+        if result is not None:
+            return RuntimeResult(result)
+
+    columns = [repeat(operand) if isinstance(operand, (int, float)) else operand for operand in numbers]
+    try:
+        return RuntimeResult(v.create_number_array(list(map(function, *columns))))
+    except (builtins.ValueError, ZeroDivisionError, OverflowError):
+        columns = [repeat(operand) if isinstance(operand, (int, float)) else operand for operand in numbers]
+        return domain_error(name, function, zip(*columns))
+
+def native(name):
+    arity = FUNCTIONS[name][1]
+    return v.NativeFunction(name, lambda arguments: apply(name, arguments), None if isinstance(arity, tuple) else arity, (("number", "array"),))
+
+def module():
+    module = v.Module("math")
+    for name in FUNCTIONS:
+        module.assign(name, native(name))
+
+    module.assign("pi", v.Number(math.pi))
+    module.assign("e", v.Number(math.e))
+    module.assign("tau", v.Number(math.tau))
+    return module
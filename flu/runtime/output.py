@@ -0,0 +1,108 @@
+import sys
+import atexit
+
+# everything show prints is collected here and written out in large blocks: when the
+# buffer fills, before ask reads an answer, before an error is shown and at exit.
+# On a terminal every show is written straight away so the output stays interactive.
+
+BUFFER_SIZE = 1 << 16
+
+class Output:
+    def __init__(self, target=None, limit=None):
+        # target None is whatever sys.stdout is when show is called, so contextlib.redirect_stdout
+        # and friends still work; limit None picks one for each target it ends up writing to
+        self.target = target
+        self.requested = limit
+        self.current = None
+        self.limit = 0
+        self.parts = []
+        self.size = 0
+
+    def write(self, text):
+        target = self.target or sys.stdout
+        if target is not self.current:
+            # what is buffered so far was meant for the previous target
+            self.flush()
+            self.current = target
+            self.limit = self.requested if self.requested is not None else (0 if interactive(target) else BUFFER_SIZE)
+
+        self.parts.append(text)
+        self.size += len(text)
+        if self.limit and self.size >= self.limit:
+            self.flush()
+
+    def finish(self):
+        # called once a show is done; with no limit everything goes out straight away
+        if not self.limit:
+            self.flush()
+
+    def flush(self):
+        target = self.current or self.target or sys.stdout
+        text = "".join(self.parts)
+        self.parts = []
+        self.size = 0
+        try:
+            if text:
+                target.write(text)
+
+            target.flush()
+        except ValueError:
+            # the target was closed after the buffer last went out
+            pass
+
+def interactive(target):
+    try:
+        return target.isatty()
+    except (AttributeError, ValueError):
+        return False
+
+sink = Output()
+
+def write(text):
+    sink.write(text)
+
+def finish():
+    sink.finish()
+
+def flush():
+    sink.flush()
+
+def redirect(target, limit=None):
+    # sends everything shown from now on to target (a file or io.StringIO when embedding),
+    # and gives back the output it replaces so it can be put back with restore
+    global sink
+    previous = sink
+    previous.flush()
+    sink = Output(target, limit)
+    return previous
+
+def restore(previous):
+    global sink
+    sink.flush()
+    sink = previous
+
+def write_value(value):
+    # arrays are written an element at a time instead of building their whole text first
+    if value.type.type != "array":
+        sink.write(value.__repr__())
+        return
+
+    sink.write("[")
+    if value.packed:
+        elements = value.storage()
+        if elements.typecode == "q":
+            sink.write("; ".join(map(str, elements)))
+        else:
+            sink.write("; ".join([str(int(number)) if number % 1 == 0 else str(number) for number in elements]))
+    elif not any(element.type.type == "array" for element in value.storage()):
+        sink.write("; ".join([element.__repr__() for element in value.storage()]))
+    else:
+        for i, element in enumerate(value):
+            if i:
+                sink.write("; ")
+
+            write_value(element)
+
+    sink.write("]")
+
+atexit.register(flush)
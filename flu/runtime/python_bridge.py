@@ -0,0 +1,216 @@
+import importlib
+import inspect
+from array import array
+from types import ModuleType
+from ..errors import RuntimeResult, ModuleError, DataTypeError
+import flu.runtime.values as v
+import flu.runtime.vector as vector
+import flu.runtime.builtin_functions as builtin_functions
+import flu.runtime.output as output
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# `get: module python.<name>` imports a Python module; its functions become native
+# functions. Arrays and matrices are handed over as lists, except to NumPy, which gets
+# read-only views of their packed storage so nothing is copied
+
+class Failure(Exception):
+    # carries an error out of a Fluentix function that Python code called back
+    def __init__(self, error):
+        super().__init__(error)
+        self.error = error
+
+def load(name, environment):
+    # every get statement for a module in one run shares one wrapper
+    modules = environment.python_modules
+    if name not in modules:
+        try:
+            modules[name] = v.PythonObject(importlib.import_module(name), name)
+        except ImportError:
+            return RuntimeResult(None, ModuleError(f"No Python module named {name}", 99)) # unexpected
+        except Exception as error:
+            return RuntimeResult(None, ModuleError(f"Cannot import Python module {name}: {error}", 99)) # unexpected
+
+    return RuntimeResult(modules[name])
+
+def attribute(owner, name):
+    try:
+        value = getattr(owner.value, name)
+    except AttributeError:
+        return RuntimeResult(None, ModuleError(f"Python {owner.name} has no attribute {name}", 99)) # unexpected
+
+    if isinstance(value, ModuleType):
+        return RuntimeResult(v.PythonObject(value, f"{owner.name}.{name}"))
+
+    return RuntimeResult(to_fluentix(value, name))
+
+def arity(function):
+    # the number of arguments when it is fixed, None when some are optional or it cannot be told
+    try:
+        parameters = inspect.signature(function).parameters.values()
+    except (TypeError, ValueError):
+        return None
+
+    count = 0
+    for parameter in parameters:
+        if parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+            return None
+
+        if parameter.kind == parameter.KEYWORD_ONLY:
+            # these cannot be given from Fluentix, so only optional ones leave a fixed count
+            if parameter.default is parameter.empty:
+                return None
+
+            continue
+
+        if parameter.default is not parameter.empty:
+            return None
+
+        count += 1
+
+    return count
+
+def takes_buffers(function):
+    # NumPy reads packed storage in place, anything else gets lists it can index, copy and encode
+    if not numpy:
+        return False
+
+    owner = getattr(function, "__self__", None)
+    module = getattr(function, "__module__", None) or type(function).__module__
+    return (module or "").startswith("numpy") or isinstance(owner, numpy.ndarray)
+
+def native(name, function):
+    buffers = takes_buffers(function)
+    def call(arguments):
+        try:
+            arguments = [to_python(argument, buffers) for argument in arguments]
+        except TypeError as error:
+            return RuntimeResult(None, DataTypeError(f"Cannot pass {error.args[0]} to Python in {name}", 99)) # unexpected
+
+        # Python code may print, so whatever show buffered has to come out first
+        output.flush()
+        try:
+            result = function(*arguments)
+        except Failure as failure:
+            return RuntimeResult(None, failure.error)
+        except Exception as error:
+            return RuntimeResult(None, ModuleError(f"{type(error).__name__} in {name}: {error}", 99)) # unexpected
+
+        return RuntimeResult(to_fluentix(result, name))
+
+    return v.NativeFunction(name, call, arity(function))
+
+def callback(function):
+    # a Fluentix function handed to Python code, called with Python values
+    def called(*arguments):
+        rt = builtin_functions.call_function(function, [to_fluentix(argument) for argument in arguments])
+        if rt.error:
+            raise Failure(rt.error)
+
+        return to_python(rt.result)
+
+    return called
+
+def to_python(value, buffers=False):
+    # buffers is only ever set for the arguments themselves, nested arrays are always lists
+    match value.type.type:
+        case "number" | "string":
+            return value.value
+        case "boolean":
+            return value.value == "true"
+        case "null":
+            return None
+        case "bytes" | "python object":
+            return value.value
+        case "array":
+            if not value.packed:
+                return [to_python(element) for element in value]
+
+            if not buffers:
+                return value.to_python()
+
+            elements = value.storage()
+            if elements is value.elements:
+                # NumPy may keep the view, so the array copies its elements before its next change
+                value.shared = True
+
+            view = vector.as_numpy(elements)
+            view.flags.writeable = False
+            return view
+        case "matrix":
+            if not buffers:
+                return [[int(number) if number % 1 == 0 else number for number in row] for row in value.to_rows()]
+
+            view = vector.as_numpy_matrix(value)
+            view.flags.writeable = False
+            return view
+        case "dictionary":
+            return {v.python_key(key): to_python(value.get(key)) for key in value.value}
+        case "set":
+            return set(map(v.python_key, value.value))
+        case "native function" | "defined function":
+            return callback(value)
+
+    raise TypeError(value.type.type)
+
+def to_fluentix(value, name=None):
+    if isinstance(value, v.RuntimeValue):
+        return value
+
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return v.translate_python_to_fluentix(value)
+
+    if isinstance(value, memoryview) and value.ndim == 1 and value.format in ("q", "l", "d") and value.itemsize == 8:
+        # a typed view of numbers, such as one over an array, is rebuilt as a packed array
+        return v.create_number_array(array("d" if value.format == "d" else "q", value.tobytes()))
+
+    if isinstance(value, (bytearray, memoryview)):
+        return v.Bytes(bytes(value))
+
+    if isinstance(value, array) and value.typecode in ("q", "d"):
+        return v.create_number_array(value[:])
+
+    if numpy and isinstance(value, numpy.generic):
+        return to_fluentix(value.item())
+
+    if numpy and isinstance(value, numpy.ndarray):
+        return from_numpy(value)
+
+    if isinstance(value, (list, tuple)):
+        if all(type(element) in (int, float) for element in value):
+            return v.create_number_array(list(value))
+
+        return v.Array([to_fluentix(element) for element in value])
+
+    if isinstance(value, dict):
+        return v.Dictionary({fluentix_key(key): to_fluentix(element) for key, element in value.items()})
+
+    if isinstance(value, (set, frozenset)):
+        return v.Set(set(map(fluentix_key, value)))
+
+    if callable(value) and not isinstance(value, ModuleType):
+        return native(name or getattr(value, "__name__", type(value).__name__), value)
+
+    return v.PythonObject(value)
+
+def fluentix_key(key):
+    if isinstance(key, bool):
+        return v.TRUE_KEY if key else v.FALSE_KEY
+
+    return key
+
+def from_numpy(value):
+    # numbers are copied once, straight into packed storage
+    if value.ndim == 1 and value.dtype.kind in "iu" and (value.dtype.kind == "i" or value.max(initial=0) < 2 ** 63):
+        return v.create_number_array(array("q", value.astype(numpy.int64).tobytes()))
+
+    if value.ndim == 1 and value.dtype.kind == "f":
+        return v.create_number_array(array("d", value.astype(numpy.float64).tobytes()))
+
+    if value.ndim == 2 and value.dtype.kind in "iuf":
+        return v.Matrix(value.shape[0], value.shape[1], array("d", value.astype(numpy.float64).tobytes()))
+
+    return to_fluentix(value.tolist())
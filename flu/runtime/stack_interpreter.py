@@ -0,0 +1,550 @@
+from ..errors import *
+import flu.runtime.values as v
+import flu.runtime.interpreter as interpreter
+
+# Every frame is a generator that yields (node, environment, in_function, in_loop)
+# for each child it needs and receives the child's RuntimeResult back, so nesting
+# lives on a Python list instead of the C stack.
+
+class Machine:
+    def run(self, ast_node, environment, in_function, in_loop):
+        stack = [self.frame(ast_node, environment, in_function, in_loop)]
+        rt = None
+        while stack:
+            try:
+                request = stack[-1].send(rt)
+            except StopIteration as result:
+                stack.pop()
+                rt = result.value
+                continue
+
+            leaf = LEAVES.get(request[0].kind.type)
+            if leaf:
+                rt = leaf(*request, False)
+            else:
+                stack.append(self.frame(*request))
+                rt = None
+
+        return rt
+
+    def frame(self, ast_node, environment, in_function, in_loop):
+        frame = FRAMES.get(ast_node.kind.type)
+        if not frame:
+            return delegate(ast_node, environment, in_function, in_loop)
+
+        return frame(self, ast_node, environment, in_function, in_loop)
+
+def evaluate(ast_node, environment, in_function, in_loop, return_env):
+    rt = Machine().run(ast_node, environment, in_function, in_loop)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    if return_env:
+        return RuntimeResult((rt.result, environment))
+
+    return RuntimeResult(rt.result)
+
+def delegate(ast_node, environment, in_function, in_loop):
+    # nodes without a frame of their own run on the recursive evaluator
+    return interpreter.evaluate(ast_node, environment, in_function, in_loop, False)
+    yield
+
+def run_program(machine, ast_node, environment, in_function, in_loop):
+    last_evaluated = None
+    for statement in ast_node.body:
+        rt = yield statement, environment, in_function, in_loop
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        last_evaluated = rt.result
+        if isinstance(last_evaluated, (v.Return, v.Stop)):
+            return RuntimeResult(last_evaluated)
+
+    return RuntimeResult(last_evaluated)
+
+def run_assignment_statement(machine, ast_node, environment, in_function, in_loop):
+    rt = yield ast_node.value, environment, in_function, in_loop
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    rt = environment.assign(ast_node.identifier, rt.result, ast_node.constant)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    return RuntimeResult(None)
+
+def run_update_statement(machine, ast_node, environment, in_function, in_loop):
+    target = ast_node.identifier
+    match target.kind.type:
+        case "Identifier":
+            rt = yield ast_node.value, environment, in_function, in_loop
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+
+            rt = environment.update(target.symbol, rt.result)
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+
+            return RuntimeResult(None)
+        case "CallExpression":
+            rt = yield target.callee, environment, in_function, in_loop
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+
+            if rt.result.type.type not in ("array", "matrix", "dictionary"):
+                return RuntimeResult(None, DataTypeError(f"Expected array, matrix or dictionary, got {rt.result.type.type}", 99)) # unexpected
+
+            collection = rt.result
+            indices = []
+            for argument in target.arguments:
+                rt = yield argument, environment, in_function, in_loop
+                if rt.error:
+                    return RuntimeResult(None, rt.error)
+
+                indices += [rt.result]
+
+            rt = yield ast_node.value, environment, in_function, in_loop
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+
+            return interpreter.store_element(collection, indices, rt.result)
+        case "FieldExpression":
+            rt = yield target.record, environment, in_function, in_loop
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+
+            record = rt.result
+            rt = interpreter.field_slot(target, record)
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+
+            slot = rt.result
+            rt = yield ast_node.value, environment, in_function, in_loop
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+
+            record.set(slot, rt.result)
+            return RuntimeResult(None)
+        case "UncheckedIndexExpression":
+            rt = yield ast_node.value, environment, in_function, in_loop
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+
+            array = environment.lookup(target.array).result
+            index = environment.lookup(target.index).result
+            array.set(index.value - 1, rt.result)
+            return RuntimeResult(None)
+
+    return (yield from delegate(ast_node, environment, in_function, in_loop))
+
+def run_get_statement(machine, ast_node, environment, in_function, in_loop):
+    module = ast_node.module
+    if module in interpreter.NATIVE_MODULES or module.startswith("python."):
+        return interpreter.evaluate_get_statement(ast_node, environment, in_function, in_loop, False)
+
+    rt = interpreter.read_module(module, environment)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    program, module_environment = rt.result
+    rt = yield program, module_environment, in_function, in_loop
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    return interpreter.assign_module(module, module_environment, environment)
+
+def run_if_unless_else_statement(machine, ast_node, environment, in_function, in_loop):
+    # walks the elif chain in place rather than nesting a frame per arm
+    while ast_node:
+        if ast_node.kind.type != "IfUnlessElseStatement":
+            rt = yield ast_node, environment, in_function, in_loop
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+
+            return RuntimeResult(rt.result)
+
+        rt = yield ast_node.condition, environment, in_function, in_loop
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        if rt.result.type.type == "boolean" and rt.result.value == "true":
+            rt = yield ast_node.body, environment, in_function, in_loop
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+
+            return RuntimeResult(rt.result)
+
+        ast_node = ast_node.next
+
+    return RuntimeResult(None)
+
+def run_jump_table_statement(machine, ast_node, environment, in_function, in_loop):
+    rt = yield ast_node.subject, environment, in_function, in_loop
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    arm = None
+    if rt.result.type.type in ("number", "string", "boolean"):
+        arm = ast_node.table.get((rt.result.type.type, rt.result.value))
+
+    if arm is not None:
+        rt = yield ast_node.arms[arm], environment, in_function, in_loop
+    elif ast_node.default:
+        rt = yield ast_node.default, environment, in_function, in_loop
+    else:
+        return RuntimeResult(None)
+
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    return RuntimeResult(rt.result)
+
+def run_return_statement(machine, ast_node, environment, in_function, in_loop):
+    rt = yield ast_node.value, environment, in_function, in_loop
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    return RuntimeResult(v.Return(rt.result))
+
+def run_loop_body(body, environment, in_function):
+    rt = yield body, environment, in_function, True
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    if isinstance(rt.result, v.Return):
+        if not in_function:
+            return RuntimeResult(None, ReturnError("Cannot return outside of function", 99)) # unexpected
+
+        return RuntimeResult(rt.result)
+
+    if isinstance(rt.result, v.Stop):
+        return RuntimeResult(v.Stop())
+
+    return None
+
+def run_until_statement(machine, ast_node, environment, in_function, in_loop):
+    body = ast_node.body
+    if ast_node.guard and interpreter.check_index_guard(ast_node.guard, environment):
+        body = ast_node.unchecked_body
+
+    while True:
+        rt = yield ast_node.condition, environment, in_function, True
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        if rt.result.type.type == "boolean" and rt.result.value == "true":
+            return RuntimeResult(None)
+
+        rt = yield from run_loop_body(body, environment, in_function)
+        if rt:
+            return RuntimeResult(None) if isinstance(rt.result, v.Stop) else rt
+
+def run_for_statement(machine, ast_node, environment, in_function, in_loop):
+    rt = yield ast_node.start, environment, in_function, in_loop
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    start = rt.result
+    rt = yield ast_node.end, environment, in_function, in_loop
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    rt = interpreter.loop_range(ast_node, start, rt.result, environment)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    values = rt.result
+    body = ast_node.body
+    if ast_node.guard and interpreter.check_index_guard(ast_node.guard, environment):
+        body = ast_node.unchecked_body
+
+    table = environment.table
+    for value in values:
+        table[ast_node.identifier] = v.Number(value)
+        rt = yield from run_loop_body(body, environment, in_function)
+        if rt:
+            return RuntimeResult(None) if isinstance(rt.result, v.Stop) else rt
+
+    return RuntimeResult(None)
+
+def run_for_each_statement(machine, ast_node, environment, in_function, in_loop):
+    rt = yield ast_node.iterable, environment, in_function, in_loop
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    rt = interpreter.loop_elements(ast_node, rt.result, environment)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    table = environment.table
+    for element in rt.result:
+        if element.error:
+            return RuntimeResult(None, element.error)
+
+        table[ast_node.identifier] = element.result
+        rt = yield from run_loop_body(ast_node.body, environment, in_function)
+        if rt:
+            return RuntimeResult(None) if isinstance(rt.result, v.Stop) else rt
+
+    return RuntimeResult(None)
+
+def run_forever_statement(machine, ast_node, environment, in_function, in_loop):
+    while True:
+        rt = yield from run_loop_body(ast_node.body, environment, in_function)
+        if rt:
+            return RuntimeResult(None) if isinstance(rt.result, v.Stop) else rt
+
+def run_include_statement(machine, ast_node, environment, in_function, in_loop):
+    rt = yield ast_node.array, environment, in_function, in_loop
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    rt = interpreter.check_include(rt.result, ast_node.index)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    collection = rt.result
+    index = None
+    if ast_node.index:
+        rt = yield ast_node.index, environment, in_function, in_loop
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        index = rt.result
+
+    rt = interpreter.include_position(collection, index)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    position = rt.result
+    rt = yield ast_node.element, environment, in_function, in_loop
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    return interpreter.include_element(collection, position, rt.result)
+
+def run_exclude_statement(machine, ast_node, environment, in_function, in_loop):
+    rt = yield ast_node.array, environment, in_function, in_loop
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    rt = interpreter.check_collection(rt.result)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    collection = rt.result
+    rt = yield ast_node.index, environment, in_function, in_loop
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    return interpreter.exclude_element(collection, rt.result)
+
+def run_array_literal(machine, ast_node, environment, in_function, in_loop):
+    array = []
+    for element in ast_node.value:
+        rt = yield element, environment, in_function, in_loop
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        array += [rt.result]
+
+    return RuntimeResult(v.Array(array))
+
+def run_slice_expression(machine, ast_node, environment, in_function, in_loop):
+    values = []
+    for node in (ast_node.array, ast_node.start, ast_node.end):
+        rt = yield node, environment, in_function, in_loop
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        values += [rt.result]
+
+    return interpreter.slice_array(*values)
+
+def run_dictionary_literal(machine, ast_node, environment, in_function, in_loop):
+    dictionary = {}
+    for key, value in zip(ast_node.keys, ast_node.values):
+        rt = yield key, environment, in_function, in_loop
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        rt = interpreter.check_key(rt.result)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        key = rt.result
+        rt = yield value, environment, in_function, in_loop
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        dictionary[key] = rt.result
+
+    return RuntimeResult(v.Dictionary(dictionary))
+
+def run_set_literal(machine, ast_node, environment, in_function, in_loop):
+    elements = set()
+    for element in ast_node.value:
+        rt = yield element, environment, in_function, in_loop
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        rt = interpreter.check_key(rt.result)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        elements.add(rt.result)
+
+    return RuntimeResult(v.Set(elements))
+
+def run_call_expression(machine, ast_node, environment, in_function, in_loop):
+    rt = yield ast_node.callee, environment, in_function, in_loop
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    callee = rt.result
+    match callee.type.type:
+        case "native function":
+            arguments = []
+            for argument in ast_node.arguments:
+                rt = yield argument, environment, in_function, in_loop
+                if rt.error:
+                    return RuntimeResult(None, rt.error)
+
+                arguments += [rt.result]
+
+            return callee.call(arguments)
+        case "defined function":
+            arguments = []
+            for argument in ast_node.arguments:
+                rt = yield argument, environment, in_function, in_loop
+                if rt.error:
+                    return RuntimeResult(None, rt.error)
+
+                arguments += [rt.result]
+
+            rt = callee.check_arguments(arguments)
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+
+            key = callee.cache.key(arguments) if callee.cache else None
+            if key is not None:
+                found, result = callee.cache.lookup(key)
+                if found:
+                    return RuntimeResult(result)
+
+            rt = interpreter.enter_call(callee)
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+
+            rt = yield callee.value, callee.bind(arguments, environment), True, in_loop
+            interpreter.leave_call()
+            rt = callee.finish(rt, in_loop)
+            if rt.error:
+                return RuntimeResult(None, rt.error)
+
+            if key is not None:
+                callee.cache.store(key, rt.result)
+
+            return RuntimeResult(rt.result)
+        case "record type":
+            values = []
+            for argument in ast_node.arguments:
+                rt = yield argument, environment, in_function, in_loop
+                if rt.error:
+                    return RuntimeResult(None, rt.error)
+
+                values += [rt.result]
+
+            return callee.create(values)
+        case "array" | "matrix" | "dictionary" | "bytes":
+            indices = []
+            for argument in ast_node.arguments:
+                rt = yield argument, environment, in_function, in_loop
+                if rt.error:
+                    return RuntimeResult(None, rt.error)
+
+                indices += [rt.result]
+
+            return interpreter.load_element(callee, indices)
+
+    return (yield from delegate(ast_node, environment, in_function, in_loop))
+
+def run_field_expression(machine, ast_node, environment, in_function, in_loop):
+    rt = yield ast_node.record, environment, in_function, in_loop
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    record = rt.result
+    rt = interpreter.field_slot(ast_node, record)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    return RuntimeResult(record.get(rt.result))
+
+def run_unary_expression(machine, ast_node, environment, in_function, in_loop):
+    rt = yield ast_node.value, environment, in_function, in_loop
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    return interpreter.unary_operation(ast_node.sign, rt.result)
+
+def run_binary_expression(machine, ast_node, environment, in_function, in_loop):
+    rt = yield ast_node.left, environment, in_function, in_loop
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    left = rt.result
+    rt = yield ast_node.right, environment, in_function, in_loop
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    return interpreter.binary_operation(ast_node.operator, left, rt.result)
+
+def run_comparison_expression(machine, ast_node, environment, in_function, in_loop):
+    rt = yield ast_node.left, environment, in_function, in_loop
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    left = rt.result
+    rt = yield ast_node.right, environment, in_function, in_loop
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    return interpreter.comparison_operation(ast_node.operator, left, rt.result)
+
+LEAVES = {
+    "Identifier": interpreter.evaluate_identifier,
+    "NumberLiteral": interpreter.evaluate_number_literal,
+    "BooleanLiteral": interpreter.evaluate_boolean_literal,
+    "NullLiteral": interpreter.evaluate_null_literal,
+    "StringLiteral": interpreter.evaluate_string_literal,
+    "UncheckedIndexExpression": interpreter.evaluate_unchecked_index_expression,
+    "StopStatement": interpreter.evaluate_stop_statement,
+    "FunctionDeclarationStatement": interpreter.evaluate_function_declaration_statement,
+    "RecordDeclarationStatement": interpreter.evaluate_record_declaration_statement
+}
+
+FRAMES = {
+    "Program": run_program,
+    "AssignmentStatement": run_assignment_statement,
+    "UpdateStatement": run_update_statement,
+    "GetStatement": run_get_statement,
+    "IfUnlessElseStatement": run_if_unless_else_statement,
+    "JumpTableStatement": run_jump_table_statement,
+    "ReturnStatement": run_return_statement,
+    "UntilStatement": run_until_statement,
+    "ForStatement": run_for_statement,
+    "ForEachStatement": run_for_each_statement,
+    "ForeverStatement": run_forever_statement,
+    "IncludeStatement": run_include_statement,
+    "ExcludeStatement": run_exclude_statement,
+    "ArrayLiteral": run_array_literal,
+    "SliceExpression": run_slice_expression,
+    "DictionaryLiteral": run_dictionary_literal,
+    "SetLiteral": run_set_literal,
+    "CallExpression": run_call_expression,
+    "FieldExpression": run_field_expression,
+    "UnaryExpression": run_unary_expression,
+    "BinaryExpression": run_binary_expression,
+    "ComparisonExpression": run_comparison_expression
+}
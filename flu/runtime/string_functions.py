@@ -0,0 +1,124 @@
+import re
+from functools import lru_cache
+from ..errors import RuntimeResult, ValueError, ArgumentError
+import flu.runtime.values as v
+import flu.runtime.array_functions as array_functions
+
+# the strings module, loaded with `get: module strings`; every function works on
+# the Python string behind a Fluentix string in one call instead of a character at a time
+
+# compiled patterns are kept, so a match inside a loop only compiles its pattern once
+PATTERN_CACHE_SIZE = 256
+
+def string_array(pieces):
+    return RuntimeResult(v.Array([v.String(piece) for piece in pieces]))
+
+def split(arguments):
+    # split: text; separator, or split: text on its own to split on any run of whitespace
+    if len(arguments) not in (1, 2):
+        return RuntimeResult(None, ArgumentError(f"Expected 1 or 2 arguments in split, got {len(arguments)}", 39))
+
+    if len(arguments) == 1:
+        return string_array(arguments[0].value.split())
+
+    separator = arguments[1].value
+    if not separator:
+        return RuntimeResult(None, ValueError("Expected a separator that is not empty in split", 99)) # unexpected
+
+    return string_array(arguments[0].value.split(separator))
+
+def find(arguments):
+    # the first position of the piece in the text, 0 when it is not there
+    return RuntimeResult(arguments[0].value.find(arguments[1].value) + 1)
+
+def replace(arguments):
+    return RuntimeResult(arguments[0].value.replace(arguments[1].value, arguments[2].value))
+
+def upper(arguments):
+    return RuntimeResult(arguments[0].value.upper())
+
+def lower(arguments):
+    return RuntimeResult(arguments[0].value.lower())
+
+def trim(arguments):
+    # trim: text removes whitespace from both ends, trim: text; characters removes those instead
+    if len(arguments) not in (1, 2):
+        return RuntimeResult(None, ArgumentError(f"Expected 1 or 2 arguments in trim, got {len(arguments)}", 39))
+
+    return RuntimeResult(arguments[0].value.strip(arguments[1].value if len(arguments) == 2 else None))
+
+def startswith(arguments):
+    return RuntimeResult(arguments[0].value.startswith(arguments[1].value))
+
+def endswith(arguments):
+    return RuntimeResult(arguments[0].value.endswith(arguments[1].value))
+
+def substring(arguments):
+    # substring: text; i; j is characters i to j inclusive, like slicing an array
+    text, start, end = arguments[0].value, arguments[1].value, arguments[2].value
+    if start % 1 != 0 or not 1 <= start <= len(text) + 1:
+        return RuntimeResult(None, ValueError(f"Expected a whole number from 1 to {len(text) + 1}, got {arguments[1].__repr__()}", 99)) # unexpected
+
+    if end % 1 != 0 or not start - 1 <= end <= len(text):
+        return RuntimeResult(None, ValueError(f"Expected a whole number from {int(start) - 1} to {len(text)}, got {arguments[2].__repr__()}", 99)) # unexpected
+
+    return RuntimeResult(text[int(start) - 1:int(end)])
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def compile_pattern(pattern):
+    return re.compile(pattern)
+
+def pattern(value):
+    try:
+        return RuntimeResult(compile_pattern(value.value))
+    except re.error as error:
+        return RuntimeResult(None, ValueError(f"Invalid pattern '{value.value}': {error.msg}", 99)) # unexpected
+
+def groups(match):
+    # the whole match and then each group, a group that did not take part is null
+    return [match.group(0)] + list(match.groups())
+
+def match(arguments):
+    # match: pattern; text gives the first match anywhere in the text, or null
+    rt = pattern(arguments[0])
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    found = rt.result.search(arguments[1].value)
+    return RuntimeResult(groups(found) if found else None)
+
+def matchall(arguments):
+    rt = pattern(arguments[0])
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    return RuntimeResult([groups(found) for found in rt.result.finditer(arguments[1].value)])
+
+def substitute(arguments):
+    # substitute: pattern; text; replacement, where \1 in the replacement is the first group
+    rt = pattern(arguments[0])
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    try:
+        return RuntimeResult(rt.result.sub(arguments[2].value, arguments[1].value))
+    except re.error as error:
+        return RuntimeResult(None, ValueError(f"Invalid replacement '{arguments[2].value}': {error.msg}", 99)) # unexpected
+
+def module():
+    module = v.Module("strings")
+    text, texts = (v.STRING,), (v.STRING, v.STRING)
+    module.assign("split", v.NativeFunction("split", split, None, texts))
+    module.assign("join", v.NativeFunction("join", array_functions.join, None, (v.ARRAY, v.STRING)))
+    module.assign("find", v.NativeFunction("find", find, 2, texts))
+    module.assign("replace", v.NativeFunction("replace", replace, 3, texts))
+    module.assign("upper", v.NativeFunction("upper", upper, 1, text))
+    module.assign("lower", v.NativeFunction("lower", lower, 1, text))
+    module.assign("trim", v.NativeFunction("trim", trim, None, texts))
+    module.assign("startswith", v.NativeFunction("startswith", startswith, 2, texts))
+    module.assign("endswith", v.NativeFunction("endswith", endswith, 2, texts))
+    module.assign("substring", v.NativeFunction("substring", substring, 3, (v.STRING, v.NUMBER)))
+    module.assign("match", v.NativeFunction("match", match, 2, texts))
+    module.assign("matchall", v.NativeFunction("matchall", matchall, 2, texts))
+    module.assign("substitute", v.NativeFunction("substitute", substitute, 3, texts))
+    return module
@@ -1,6 +1,23 @@
 from ..errors import RuntimeResult, VariableError, DataTypeError, ArgumentError, StopError
 import flu.runtime.interpreter as interpreter
 import flu.runtime.builtin_functions
+import flu.runtime.array_functions
+import flu.runtime.file_functions
+from collections import OrderedDict
+from array import array
+from itertools import islice
+from mmap import mmap
+from types import ModuleType
+
+# argument types the builtins declare, checked once by NativeFunction.call
+NUMBER = ("number",)
+STRING = ("string",)
+ARRAY = ("array",)
+BYTES = ("bytes",)
+DICTIONARY = ("dictionary",)
+MATRIX = ("matrix",)
+FUNCTION = ("native function", "defined function")
+ITERABLE = ("sequence", "array", "string", "bytes", "dictionary", "set", "file")
 
 class Environment:
     def __init__(self, extension, parent=None):
@@ -8,6 +25,18 @@ class Environment:
         self.parent = parent
         self.constants = set()
         self.extension = extension
+        # Python modules imported by this run, kept on the builtins environment
+        self.python_modules = parent.python_modules if parent else {}
+        # whether the run evaluates on the explicit frame stack, see interpreter.run
+        self.explicit_stack = parent.explicit_stack if parent else False
+        # which table held each outer name looked up from here, see lookup
+        self.found = {}
+        # how often each name was newly assigned in an environment that others chain
+        # through, shared by the whole run
+        self.shadowed = parent.shadowed if parent else {}
+        self.shared = False
+        if parent:
+            parent.shared = True
 
         if not self.parent:
             # normal
@@ -17,26 +46,96 @@ class Environment:
                 self.assign("input", NativeFunction("input", flu.runtime.builtin_functions.ask), True)
             
             self.assign("stop", NativeFunction("stop", flu.runtime.builtin_functions.stop, 1), True)
+            self.assign("readall", NativeFunction("readall", flu.runtime.builtin_functions.readall, 0), True)
+            self.assign("readnumbers", NativeFunction("readnumbers", flu.runtime.builtin_functions.readnumbers, 0), True)
 
             # conversions
             self.assign("tonumber", NativeFunction("tonumber", flu.runtime.builtin_functions.tonumber, 1), True)
             self.assign("tostring", NativeFunction("tostring", flu.runtime.builtin_functions.tostring, 1), True)
 
             # math
-            self.assign("absolute", NativeFunction("absolute", flu.runtime.builtin_functions.absolute, 1), True)
+            self.assign("absolute", NativeFunction("absolute", flu.runtime.builtin_functions.absolute, 1, (("number", "string"),)), True)
+            self.assign("sum", NativeFunction("sum", flu.runtime.builtin_functions.sum_, None, (("number", "array", "sequence"),)), True)
+            self.assign("product", NativeFunction("product", flu.runtime.builtin_functions.product, None, (("number", "array", "sequence"),)), True)
+            self.assign("min", NativeFunction("min", flu.runtime.builtin_functions.min_, None, (("number", "array", "sequence"),)), True)
+            self.assign("max", NativeFunction("max", flu.runtime.builtin_functions.max_, None, (("number", "array", "sequence"),)), True)
+            self.assign("mean", NativeFunction("mean", flu.runtime.builtin_functions.mean, None, (("number", "array", "sequence"),)), True)
+
+            # arrays
+            self.assign("length", NativeFunction("length", flu.runtime.array_functions.length, 1, (("array", "string", "bytes", "dictionary", "set", "matrix"),)), True)
+            self.assign("sort", NativeFunction("sort", flu.runtime.array_functions.sort, None, (ARRAY, FUNCTION)), True)
+            self.assign("search", NativeFunction("search", flu.runtime.array_functions.search, 2, (ARRAY, ("number", "string"))), True)
+            self.assign("reverse", NativeFunction("reverse", flu.runtime.array_functions.reverse, 1, (ARRAY,)), True)
+            self.assign("indexof", NativeFunction("indexof", flu.runtime.array_functions.indexof, 2, (("array", "string"), None)), True)
+            self.assign("concat", NativeFunction("concat", flu.runtime.array_functions.concat, None, (ARRAY,)), True)
+            self.assign("join", NativeFunction("join", flu.runtime.array_functions.join, None, (ARRAY, STRING)), True)
+
+            # dictionaries and sets
+            self.assign("set", NativeFunction("set", flu.runtime.builtin_functions.set_), True)
+            self.assign("keys", NativeFunction("keys", flu.runtime.builtin_functions.keys, 1, (DICTIONARY,)), True)
+            self.assign("values", NativeFunction("values", flu.runtime.builtin_functions.values, 1, (DICTIONARY,)), True)
+
+            # sequences
+            self.assign("range", NativeFunction("range", flu.runtime.builtin_functions.range_, None, (NUMBER,)), True)
+            self.assign("lines", NativeFunction("lines", flu.runtime.builtin_functions.lines, None, (STRING,)), True)
+            self.assign("map", NativeFunction("map", flu.runtime.builtin_functions.map_, 2, (ITERABLE, FUNCTION)), True)
+            self.assign("filter", NativeFunction("filter", flu.runtime.builtin_functions.filter_, 2, (ITERABLE, FUNCTION)), True)
+            self.assign("take", NativeFunction("take", flu.runtime.builtin_functions.take, 2, (ITERABLE, NUMBER)), True)
+            self.assign("zip", NativeFunction("zip", flu.runtime.builtin_functions.zip_, None, (ITERABLE,)), True)
+            self.assign("collect", NativeFunction("collect", flu.runtime.builtin_functions.collect, 1, (ITERABLE,)), True)
+
+            # bytes
+            self.assign("bytes", NativeFunction("bytes", flu.runtime.builtin_functions.bytes_, None, (("string", "array", "bytes"), STRING)), True)
+            self.assign("decode", NativeFunction("decode", flu.runtime.builtin_functions.decode, None, (BYTES, STRING)), True)
+            self.assign("readbytes", NativeFunction("readbytes", flu.runtime.builtin_functions.readbytes, 1, (STRING,)), True)
+            self.assign("writebytes", NativeFunction("writebytes", flu.runtime.builtin_functions.writebytes, 2, (STRING, BYTES)), True)
+
+            # copies
+            self.assign("persistent", NativeFunction("persistent", flu.runtime.builtin_functions.persistent, 1, (ARRAY,)), True)
+            self.assign("copy", NativeFunction("copy", flu.runtime.builtin_functions.copy, 1), True)
+
+            # matrices
+            self.assign("matrix", NativeFunction("matrix", flu.runtime.builtin_functions.matrix, None, (("number", "array"),)), True)
+            self.assign("transpose", NativeFunction("transpose", flu.runtime.builtin_functions.transpose, 1, (MATRIX,)), True)
+            self.assign("matmul", NativeFunction("matmul", flu.runtime.builtin_functions.matmul, 2, (MATRIX,)), True)
+            self.assign("row", NativeFunction("row", flu.runtime.builtin_functions.row, 2, (MATRIX, NUMBER)), True)
+            self.assign("column", NativeFunction("column", flu.runtime.builtin_functions.column, 2, (MATRIX, NUMBER)), True)
+            self.assign("shape", NativeFunction("shape", flu.runtime.builtin_functions.shape, 1, (MATRIX,)), True)
+            self.assign("loadmatrix", NativeFunction("loadmatrix", flu.runtime.builtin_functions.loadmatrix, 1, (STRING,)), True)
+
+            # functions
+            self.assign("memostats", NativeFunction("memostats", flu.runtime.builtin_functions.memostats, 1, (("defined function",),)), True)
     
     def lookup(self, var_name):
-        if var_name not in self.table:
-            if not self.parent:
+        # environments chain once per active call, so instead of walking to the top every
+        # time each one remembers which table held an outer name; that holds until the name
+        # is assigned in an environment in between, which bumps its count in shadowed
+        table = self.table
+        if var_name in table:
+            return RuntimeResult(table[var_name], None)
+
+        count = self.shadowed.get(var_name, 0)
+        missed = []
+        environment = self
+        while True:
+            found = environment.found.get(var_name)
+            if found and found[1] == count:
+                table = found[0]
+                break
+
+            missed += [environment]
+            environment = environment.parent
+            if not environment:
                 return RuntimeResult(None, VariableError(f"Cannot get the value of variable {var_name} because it does not exist.", 35))
 
-            rt = self.parent.lookup(var_name)
-            if rt.error:
-                return RuntimeResult(None, rt.error)
-            
-            return RuntimeResult(rt.result, None)
-        
-        return RuntimeResult(self.table[var_name], None)
+            if var_name in environment.table:
+                table = environment.table
+                break
+
+        for environment in missed:
+            environment.found[var_name] = (table, count)
+
+        return RuntimeResult(table[var_name], None)
 
     def update(self, var_name, value):
         if var_name not in self.table:
@@ -56,18 +155,23 @@ class Environment:
         if constant:
             self.constants.add(var_name)
 
+        if self.shared:
+            self.shadowed[var_name] = self.shadowed.get(var_name, 0) + 1
+
         return RuntimeResult(None, None)
     
     def copy(self):
-        env = Environment(extension=self.extension)
-        env.parent = self
-        return env
+        # the parent is passed in so the child does not register its own builtins
+        return Environment(self.extension, self)
 
 class ValueType:
     def __init__(self, type):
         self.type = type
 
 class RuntimeValue:
+    # lets subclasses that declare __slots__ (records) go without a __dict__
+    __slots__ = ("type",)
+
     def __init__(self, type):
         self.type = type
 
@@ -133,58 +237,856 @@ class Null(RuntimeValue):
         return "null"
 
 class String(RuntimeValue):
+    # a string built with + keeps its pieces in a list shared with the string it was
+    # built from, so appending is O(1); the pieces are joined the first time the text is used
     def __init__(self, value):
         super().__init__(ValueType("string"))
-        self.value = value
+        self.parts = [value]
+        self.count = 1
+    
+    @property
+    def value(self):
+        if self.count > 1:
+            self.parts = ["".join(self.parts[:self.count])]
+            self.count = 1
+        
+        return self.parts[0]
+
+    @value.setter
+    def value(self, value):
+        self.parts = [value]
+        self.count = 1
+
+    def concat(self, other):
+        text = other.value
+        if self.count != len(self.parts):
+            # something was already appended after this string, start a new list
+            return String(self.value + text)
+        
+        self.parts.append(text)
+        result = String("")
+        result.parts = self.parts
+        result.count = self.count + 1
+        return result
     
     def __repr__(self):
         return self.value
 
+class Bytes(RuntimeValue):
+    # raw binary data, never changed in place like strings; a slice is another window
+    # onto the same bytes object and natives get a memoryview of the window, so neither copies
+    def __init__(self, data, start=0, stop=None):
+        super().__init__(ValueType("bytes"))
+        self.data = data if isinstance(data, (bytes, mmap)) else bytes(data)
+        self.start = start
+        self.stop = len(self.data) if stop is None else stop
+
+    @property
+    def value(self):
+        return memoryview(self.data)[self.start:self.stop]
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def get(self, index):
+        return Number(self.data[self.start + index])
+
+    def slice(self, start, stop):
+        return Bytes(self.data, self.start + start, self.start + stop)
+
+    def find(self, other):
+        return self.data.find(other, self.start, self.stop) != -1
+
+    def __eq__(self, other):
+        return isinstance(other, Bytes) and self.value == other.value
+
+    def __repr__(self):
+        return repr(self.value.tobytes())
+
+class File(RuntimeValue):
+    # an open file from the file module; value is the buffered binary handle, text is
+    # decoded a line at a time so nothing ever holds the whole file
+    def __init__(self, path, value, mode):
+        super().__init__(ValueType("file"))
+        self.path = path
+        self.value = value
+        self.mode = mode
+
+    def lines(self):
+        try:
+            for line in self.value:
+                yield RuntimeResult(String(line.decode("utf-8", "replace").rstrip("\r\n")))
+        except (OSError, ValueError) as error:
+            # closed or reopened for writing while the lines were being read
+            yield flu.runtime.file_functions.file_error("read", self, error)
+
+    def __repr__(self):
+        return f"<file {self.path}>"
+
+class PythonObject(RuntimeValue):
+    # a Python module or object with no Fluentix counterpart, from `get: module python.<name>`;
+    # its attributes are read and its methods called like a module's, `object: (name: ...)`
+    def __init__(self, value, name=None):
+        super().__init__(ValueType("python object"))
+        self.value = value
+        self.name = name or type(value).__name__
+        # the members of a module never change, so each is wrapped only once
+        self.table = {} if isinstance(value, ModuleType) else None
+
+    def lookup(self, var_name):
+        import flu.runtime.python_bridge as python_bridge
+        if self.table is not None and var_name in self.table:
+            return RuntimeResult(self.table[var_name])
+
+        rt = python_bridge.attribute(self, var_name)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        if self.table is not None:
+            self.table[var_name] = rt.result
+
+        return RuntimeResult(rt.result)
+
+    def __repr__(self):
+        if isinstance(self.value, ModuleType):
+            return f"<python module {self.name}>"
+
+        return f"<python {self.name}>"
+
 class Array(RuntimeValue):
+    # all-number arrays are kept unboxed in an array.array ('q' for integers,
+    # 'd' otherwise) and fall back to a list of values once anything else is stored
     def __init__(self, value):
         super().__init__(ValueType("array"))
+        self.elements = pack(value)
+        # set while a slice still looks at these elements, the next write copies them first
+        self.shared = False
+    
+    @property
+    def value(self):
+        elements = self.storage()
+        if isinstance(elements, list):
+            return elements
+        
+        return [self.box(element) for element in elements]
+
+    @value.setter
+    def value(self, value):
+        self.elements = pack(value)
+        self.shared = False
+
+    @property
+    def packed(self):
+        return not isinstance(self.elements, list)
+
+    def storage(self):
+        return self.elements
+
+    def own(self):
+        if self.shared:
+            self.elements = self.elements[:]
+            self.shared = False
+
+    def box(self, element):
+        if self.elements.typecode == "q":
+            return Number(element)
+        
+        return create_number(element)
+
+    def __len__(self):
+        return len(self.elements)
+    
+    def __iter__(self):
+        if not self.packed:
+            return iter(self.storage())
+        
+        return (self.box(element) for element in self.storage())
+
+    def get(self, index):
+        elements = self.elements
+        if isinstance(elements, list):
+            return elements[index]
+        
+        if elements.typecode == "q":
+            return Number(elements[index])
+        
+        return create_number(elements[index])
+    
+    def set(self, index, element):
+        self.own()
+        if self.packed and not self.fits(element):
+            self.widen(element)
+        
+        self.elements[index] = element.value if self.packed else element
+    
+    def insert(self, index, element):
+        self.own()
+        if not self.elements and not self.packed:
+            # an empty array is a list, so one built up from [] packs on its first element
+            self.elements = pack([element])
+            return
+
+        if self.packed and not self.fits(element):
+            self.widen(element)
+        
+        self.elements.insert(index, element.value if self.packed else element)
+    
+    def pop(self, index):
+        self.own()
+        return self.elements.pop(index)
+
+    def slice(self, start, stop):
+        return ArrayView(self, start, stop)
+
+    def fits(self, element):
+        if element.type.type != "number":
+            return False
+        
+        if self.elements.typecode == "q":
+            return isinstance(element.value, int) and INT64_MIN <= element.value <= INT64_MAX
+        
+        return isinstance(element.value, float) or -FLOAT_INT_LIMIT <= element.value <= FLOAT_INT_LIMIT
+
+    def widen(self, element):
+        # integers become doubles when a fraction comes in, anything else boxes the array
+        if element.type.type == "number" and self.elements.typecode == "q" and (isinstance(element.value, float) or abs(element.value) <= FLOAT_INT_LIMIT):
+            if all(-FLOAT_INT_LIMIT <= number <= FLOAT_INT_LIMIT for number in self.elements):
+                self.elements = array("d", self.elements)
+                return
+        
+        self.elements = list(self)
+
+    def to_python(self):
+        elements = self.storage()
+        if not self.packed:
+            return [translate_fluentix_to_python(element) for element in elements]
+        
+        if elements.typecode == "q":
+            return elements.tolist()
+        
+        return [int(element) if element % 1 == 0 else element for element in elements]
+
+    def __eq__(self, other):
+        if not isinstance(other, Array) or len(self) != len(other):
+            return False
+        
+        if self.packed and other.packed:
+            return self.storage() == other.storage()
+        
+        return all(values_equal(left, right) for left, right in zip(self, other))
+
+    def __repr__(self):
+        return f"[{'; '.join([element.__repr__() for element in self])}]"
+
+class ArrayView(Array):
+    # elements start to stop of another array, read in place; the first write
+    # copies them out and turns the view into a plain array
+    def __init__(self, source, start, stop):
+        RuntimeValue.__init__(self, ValueType("array"))
+        if isinstance(source, ArrayView):
+            start, stop = start + source.start, stop + source.start
+        else:
+            source.shared = True
+        
+        self.elements = source.elements
+        self.start = start
+        self.stop = stop
+        self.shared = False
+
+    def storage(self):
+        return self.elements[self.start:self.stop]
+
+    def own(self):
+        self.elements = self.storage()
+        self.__class__ = Array
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def get(self, index):
+        return Array.get(self, self.start + index)
+
+    def set(self, index, element):
+        self.own()
+        self.set(index, element)
+
+    def insert(self, index, element):
+        self.own()
+        self.insert(index, element)
+
+    def pop(self, index):
+        self.own()
+        return self.pop(index)
+
+# children per trie node, and the index bits each level consumes
+TRIE_WIDTH, TRIE_BITS = 32, 5
+
+class PersistentArray(Array):
+    # boxed elements in a 32-way trie whose nodes are never changed once built:
+    # a write copies the nodes on the path to its leaf, so `copy:` can hand out
+    # a snapshot that shares the whole trie
+    def __init__(self, value):
+        RuntimeValue.__init__(self, ValueType("array"))
+        self.root, self.size, self.shift = build_trie(list(value))
+
+    @property
+    def value(self):
+        return list(self)
+
+    @value.setter
+    def value(self, value):
+        self.root, self.size, self.shift = build_trie(list(value))
+
+    @property
+    def packed(self):
+        return False
+
+    def storage(self):
+        return list(self)
+
+    def own(self):
+        pass
+
+    def copy(self):
+        snapshot = PersistentArray([])
+        snapshot.root, snapshot.size, snapshot.shift = self.root, self.size, self.shift
+        return snapshot
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return trie_elements(self.root, self.shift)
+
+    def get(self, index):
+        node = self.root
+        for level in range(self.shift, 0, -TRIE_BITS):
+            node = node[(index >> level) & (TRIE_WIDTH - 1)]
+
+        return node[index & (TRIE_WIDTH - 1)]
+
+    def set(self, index, element):
+        self.root = trie_set(self.root, self.shift, index, element)
+
+    def insert(self, index, element):
+        if index != self.size:
+            elements = list(self)
+            elements.insert(index, element)
+            self.value = elements
+            return
+
+        if self.size == TRIE_WIDTH << self.shift:
+            # the trie is full, it grows a level with the old root as its first child
+            self.root = [self.root, trie_path(self.shift, element)]
+            self.shift += TRIE_BITS
+        else:
+            self.root = trie_append(self.root, self.shift, self.size, element)
+
+        self.size += 1
+
+    def pop(self, index):
+        element = self.get(index)
+        if index != self.size - 1:
+            elements = list(self)
+            del elements[index]
+            self.value = elements
+            return element
+
+        self.root = trie_pop(self.root, self.shift, index)
+        self.size -= 1
+        if self.shift and len(self.root) == 1:
+            self.root = self.root[0]
+            self.shift -= TRIE_BITS
+
+        return element
+
+    def slice(self, start, stop):
+        return PersistentArray(islice(self, start, stop))
+
+def build_trie(elements):
+    # returns the root, the number of elements and the shift of the root level
+    nodes = [elements[i:i + TRIE_WIDTH] for i in range(0, len(elements), TRIE_WIDTH)]
+    shift = 0
+    while len(nodes) > 1:
+        nodes = [nodes[i:i + TRIE_WIDTH] for i in range(0, len(nodes), TRIE_WIDTH)]
+        shift += TRIE_BITS
+
+    return (nodes[0] if nodes else []), len(elements), shift
+
+def trie_elements(node, level):
+    if not level:
+        yield from node
+        return
+
+    for child in node:
+        yield from trie_elements(child, level - TRIE_BITS)
+
+def trie_set(node, level, index, element):
+    node = node[:]
+    if not level:
+        node[index & (TRIE_WIDTH - 1)] = element
+        return node
+
+    i = (index >> level) & (TRIE_WIDTH - 1)
+    node[i] = trie_set(node[i], level - TRIE_BITS, index, element)
+    return node
+
+def trie_path(level, element):
+    node = [element]
+    for _ in range(level // TRIE_BITS):
+        node = [node]
+
+    return node
+
+def trie_append(node, level, index, element):
+    node = node[:]
+    if not level:
+        node.append(element)
+        return node
+
+    i = (index >> level) & (TRIE_WIDTH - 1)
+    if i < len(node):
+        node[i] = trie_append(node[i], level - TRIE_BITS, index, element)
+    else:
+        node.append(trie_path(level - TRIE_BITS, element))
+
+    return node
+
+def trie_pop(node, level, index):
+    # removes the last element, dropping the nodes it leaves empty
+    node = node[:]
+    if not level:
+        node.pop()
+        return node
+
+    i = (index >> level) & (TRIE_WIDTH - 1)
+    child = trie_pop(node[i], level - TRIE_BITS, index)
+    if child:
+        node[i] = child
+    else:
+        del node[i]
+
+    return node
+
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+# beyond this, a double cannot hold every integer exactly
+FLOAT_INT_LIMIT = 2 ** 53
+
+def pack(elements):
+    if not elements or any(element.type.type != "number" for element in elements):
+        return list(elements)
+    
+    packed = pack_numbers([element.value for element in elements])
+    if packed is None:
+        return list(elements)
+    
+    return packed
+
+def pack_numbers(numbers):
+    try:
+        return array("q", numbers)
+    except (TypeError, OverflowError):
+        pass
+    
+    if all(isinstance(number, float) or -FLOAT_INT_LIMIT <= number <= FLOAT_INT_LIMIT for number in numbers):
+        return array("d", numbers)
+    
+    return None
+
+def create_number_array(numbers):
+    # builds an array straight from Python numbers, without boxing them first
+    result = Array([])
+    result.elements = numbers if isinstance(numbers, array) else pack_numbers(numbers)
+    if result.elements is None:
+        result.elements = [create_number(number) for number in numbers]
+    
+    return result
+
+def values_equal(left, right):
+    if left.type.type != right.type.type:
+        return False
+    
+    match left.type.type:
+        case "array" | "matrix" | "dictionary" | "set" | "record" | "bytes":
+            return left == right
+        case "null":
+            return True
+    
+    return left.value == right.value
+
+class Dictionary(RuntimeValue):
+    # keys are stored as plain Python numbers, strings and booleans, so the dict
+    # itself is what native functions get and give back; values are boxed on first read
+    def __init__(self, value=None):
+        super().__init__(ValueType("dictionary"))
+        self.value = {} if value is None else value
+    
+    def get(self, key):
+        value = self.value[key]
+        if not isinstance(value, RuntimeValue):
+            value = translate_python_to_fluentix(value)
+            self.value[key] = value
+        
+        return value
+    
+    def set(self, key, value):
+        self.value[key] = value
+
+    def __len__(self):
+        return len(self.value)
+
+    def __eq__(self, other):
+        if not isinstance(other, Dictionary) or self.value.keys() != other.value.keys():
+            return False
+        
+        return all(values_equal(self.get(key), other.get(key)) for key in self.value)
+
+    def __repr__(self):
+        return f"{{{'; '.join([f'{translate_python_to_fluentix(key).__repr__()}: {self.get(key).__repr__()}' for key in list(self.value)])}}}"
+
+class Set(RuntimeValue):
+    def __init__(self, value=None):
+        super().__init__(ValueType("set"))
+        self.value = set() if value is None else value
+
+    def __len__(self):
+        return len(self.value)
+
+    def __eq__(self, other):
+        return isinstance(other, Set) and self.value == other.value
+
+    def __repr__(self):
+        return f"{{{'; '.join([translate_python_to_fluentix(element).__repr__() for element in self.value])}}}"
+
+KEY_TYPES = ("number", "string", "boolean")
+
+class BooleanKey:
+    # true and false as dictionary keys and set elements; Python's True and False
+    # would be the same keys as 1 and 0
+    def __init__(self, value):
         self.value = value
+
+    def __eq__(self, other):
+        return isinstance(other, BooleanKey) and self.value == other.value
+
+    def __hash__(self):
+        return hash((BooleanKey, self.value))
+
+    def __repr__(self):
+        return "true" if self.value else "false"
+
+TRUE_KEY, FALSE_KEY = BooleanKey(True), BooleanKey(False)
+
+def hash_key(value):
+    # the Python value a dictionary key or set element is stored as, or None when it cannot be one
+    if value.type.type not in KEY_TYPES:
+        return None
     
+    if value.type.type == "boolean":
+        return TRUE_KEY if value.value == "true" else FALSE_KEY
+
+    return value.value
+
+def python_key(key):
+    # a stored key as the plain Python value code outside Fluentix expects
+    return key.value if isinstance(key, BooleanKey) else key
+
+class Sequence(RuntimeValue):
+    # a lazy stream of values: source() starts a new pass and yields RuntimeResults,
+    # so stages stacked on top of each other run as one loop and stop at the first error
+    def __init__(self, source):
+        super().__init__(ValueType("sequence"))
+        self.source = source
+
+    def iterate(self):
+        return self.source()
+
     def __repr__(self):
-        return f"[{'; '.join([element.__repr__() for element in self.value])}]"
+        return "<sequence>"
+
+def iterate(value):
+    # one pass over anything a for-each loop or a sequence stage can walk, as RuntimeResults
+    match value.type.type:
+        case "sequence":
+            return RuntimeResult(value.iterate())
+        case "array":
+            return RuntimeResult(map(RuntimeResult, value))
+        case "string":
+            return RuntimeResult(map(RuntimeResult, map(String, value.value)))
+        case "bytes":
+            return RuntimeResult(map(RuntimeResult, map(Number, value.value)))
+        case "file":
+            if value.value.closed or value.mode != "read":
+                return flu.runtime.file_functions.file_error("read", value, None)
+
+            return RuntimeResult(value.lines())
+        case "dictionary" | "set":
+            # a copy of the keys, so the loop may change the collection
+            return RuntimeResult(map(RuntimeResult, map(translate_python_to_fluentix, list(value.value))))
+
+    return RuntimeResult(None, DataTypeError(f"Expected sequence, array, string, bytes, dictionary, set or file, got {value.type.type}", 99)) # unexpected
+
+class RecordType(RuntimeValue):
+    # declared with `record Name with: a; b`, calling it builds a record
+    def __init__(self, name, fields):
+        super().__init__(ValueType("record type"))
+        self.name = name
+        self.fields = fields
+        self.slots = {field: slot for slot, field in enumerate(fields)}
+        # shared by every record of this type
+        self.record_value_type = ValueType("record")
+
+    def create(self, values):
+        if len(values) != len(self.fields):
+            return RuntimeResult(None, ArgumentError(f"Expected {len(self.fields)} arguments in {self.name}, got {len(values)}/{len(self.fields)}", 39))
+
+        return RuntimeResult(Record(self, values))
+
+    def __repr__(self):
+        return f"<record {self.name}>"
+
+class Record(RuntimeValue):
+    # the field values in one list, in the order the record type declares them;
+    # numbers are kept as plain Python numbers and boxed when read, like packed arrays
+    __slots__ = ("record_type", "values")
+
+    def __init__(self, record_type, values):
+        self.type = record_type.record_value_type
+        self.record_type = record_type
+        self.values = [value.value if value.type.type == "number" else value for value in values]
+
+    def get(self, slot):
+        value = self.values[slot]
+        if type(value) is int:
+            return Number(value)
+
+        if type(value) is float:
+            return create_number(value)
+
+        return value
+
+    def set(self, slot, value):
+        self.values[slot] = value.value if value.type.type == "number" else value
+
+    def __eq__(self, other):
+        return (isinstance(other, Record) and self.record_type is other.record_type
+                and all(values_equal(self.get(slot), other.get(slot)) for slot in range(len(self.values))))
+
+    def __repr__(self):
+        fields = "; ".join([f"{field}: {self.get(slot).__repr__()}" for slot, field in enumerate(self.record_type.fields)])
+        return f"{self.record_type.name}({fields})"
+
+class Matrix(RuntimeValue):
+    # a rows x columns grid of numbers laid out in one array('d'); rows, columns
+    # and transposes are views over the same buffer with different strides
+    def __init__(self, rows, columns, data=None, offset=0, strides=None):
+        super().__init__(ValueType("matrix"))
+        self.rows = rows
+        self.columns = columns
+        self.data = data if data is not None else array("d", bytes(8 * rows * columns))
+        self.offset = offset
+        self.strides = strides or (columns, 1)
+    
+    @classmethod
+    def from_rows(cls, rows):
+        columns = len(rows[0]) if rows else 0
+        data = array("d")
+        for row in rows:
+            data.extend(row)
+        
+        return cls(len(rows), columns, data)
+
+    def position(self, row, column):
+        return self.offset + row * self.strides[0] + column * self.strides[1]
+
+    def get(self, row, column):
+        return create_number(self.data[self.position(row, column)])
+    
+    def set(self, row, column, value):
+        self.data[self.position(row, column)] = value
+
+    def row(self, row):
+        return MatrixVector(1, self.columns, self.data, self.position(row, 0), self.strides)
+    
+    def column(self, column):
+        return MatrixVector(self.rows, 1, self.data, self.position(0, column), self.strides)
+    
+    def transpose(self):
+        return Matrix(self.columns, self.rows, self.data, self.offset, self.strides[::-1])
+
+    def to_rows(self):
+        data = self.data
+        return [[data[self.position(row, column)] for column in range(self.columns)] for row in range(self.rows)]
+
+    def __len__(self):
+        return self.rows
+
+    def __eq__(self, other):
+        return isinstance(other, Matrix) and (self.rows, self.columns) == (other.rows, other.columns) and self.to_rows() == other.to_rows()
+
+    def __repr__(self):
+        rows = ["; ".join([create_number(number).__repr__() for number in row]) for row in self.to_rows()]
+        return f"[{'; '.join([f'[{row}]' for row in rows])}]"
+
+class MatrixVector(Matrix):
+    # a row or column of a matrix, from `M: i`, row or column; still a view onto the
+    # matrix buffer, but indexed like an array, so `R: j` is its j-th element
+    def element(self, index):
+        return (0, index) if self.rows == 1 else (index, 0)
 
 class NativeFunction(RuntimeValue):
-    def __init__(self, name, value, arguments=None):
+    def __init__(self, name, value, arguments=None, types=None):
         super().__init__(ValueType("native function"))
         self.name = name
         self.value = value
         self.arguments = arguments
-    
+        # the type names each argument may have, None for any; the last entry covers any further arguments
+        self.types = types
+        # resolved once here into the positions that are checked and what covers the rest,
+        # so a call only looks each argument's type up in a set
+        self.checks, self.rest = (), None
+        if types:
+            count = len(types) - 1 if arguments is None else arguments
+            self.checks = tuple((i, frozenset(types[min(i, len(types) - 1)])) for i in range(count) if types[min(i, len(types) - 1)])
+            if arguments is None and types[-1]:
+                self.rest = (len(types) - 1, frozenset(types[-1]))
+
     def call(self, arguments):
-        if self.arguments == None:
-            return self.value(arguments)
-        
-        if len(arguments) != self.arguments:
+        # takes and gives Fluentix values whichever way the function itself is written
+        if self.arguments != None and len(arguments) != self.arguments:
             return RuntimeResult(None, ArgumentError(f"Expected {self.arguments} argument in {self.name}, got {len(arguments)}/{self.arguments}", 39))
 
-        return self.value(arguments)
+        for i, accepted in self.checks:
+            if i < len(arguments) and arguments[i].type.type not in accepted:
+                return self.type_error(i, arguments[i])
+
+        if self.rest:
+            start, accepted = self.rest
+            for i in range(start, len(arguments)):
+                if arguments[i].type.type not in accepted:
+                    return self.type_error(i, arguments[i])
+
+        rt = self.value(arguments)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        return RuntimeResult(translate_python_to_fluentix(rt.result))
+
+    def type_error(self, i, argument):
+        accepted = self.types[min(i, len(self.types) - 1)]
+        expected = " or ".join([", ".join(accepted[:-1]), accepted[-1]] if len(accepted) > 1 else accepted)
+        return RuntimeResult(None, DataTypeError(f"Expected {expected} in {self.name}, got {argument.type.type}", 99)) # unexpected
 
     def __repr__(self):
         return f"<function {self.name}>"
 
+class FunctionCache:
+    # bounded LRU cache of results of a pure defined function
+    HASHABLE = ("number", "string", "boolean")
+
+    def __init__(self, size):
+        self.size = size
+        self.table = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, arguments):
+        key = []
+        for argument in arguments:
+            if argument.type.type in self.HASHABLE:
+                key += [(argument.type.type, argument.value)]
+            elif argument.type.type == "null":
+                key += [("null", None)]
+            else:
+                return None
+
+        return tuple(key)
+
+    def lookup(self, key):
+        if key not in self.table:
+            self.misses += 1
+            return False, None
+
+        self.hits += 1
+        self.table.move_to_end(key)
+        return True, self.table[key]
+
+    def store(self, key, result):
+        # arrays and functions are shared by reference, so only immutable results are kept
+        if result is not None and result.type.type not in self.HASHABLE + ("null",):
+            return
+
+        self.table[key] = result
+        if len(self.table) > self.size:
+            self.table.popitem(last=False)
+
 class DefinedFunction(RuntimeValue):
-    def __init__(self, name, value, arguments):
+    def __init__(self, name, value, arguments, cache=None, environment=None):
         super().__init__(ValueType("defined function"))
         self.name = name
         self.value = value
         self.arguments = arguments
+        self.cache = cache
+        # where it was declared, for calls made by native functions such as map
+        self.environment = environment
     
-    def call(self, arguments, environment, in_loop):
+    def check_arguments(self, arguments):
         if len(arguments) != len(self.arguments):
             return RuntimeResult(None, ArgumentError(f"Expected {len(self.arguments)} arguments in {self.name}, got {len(arguments)}/{len(self.arguments)}", 39))
 
+        return RuntimeResult(None)
+
+    def call(self, arguments, environment, in_loop):
+        rt = self.check_arguments(arguments)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        if self.cache is None:
+            return self.evaluate(arguments, environment, in_loop)
+
+        key = self.cache.key(arguments)
+        if key is None:
+            return self.evaluate(arguments, environment, in_loop)
+
+        found, result = self.cache.lookup(key)
+        if found:
+            return RuntimeResult(result)
+
+        rt = self.evaluate(arguments, environment, in_loop)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        self.cache.store(key, rt.result)
+        return RuntimeResult(rt.result)
+
+    def evaluate(self, arguments, environment, in_loop):
+        rt = interpreter.enter_call(self)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        environment = self.bind(arguments, environment)
+        try:
+            # on whichever evaluator the run was started with, see interpreter.run
+            if environment.explicit_stack:
+                import flu.runtime.stack_interpreter as stack_interpreter
+                rt = stack_interpreter.evaluate(self.value, environment, True, in_loop, False)
+            else:
+                rt = interpreter.evaluate(self.value, environment, True, in_loop, False)
+        finally:
+            interpreter.leave_call()
+
+        return self.finish(rt, in_loop)
+
+    def bind(self, arguments, environment):
         env = environment.copy()
         for i, argument in enumerate(arguments):
             env.table.update({self.arguments[i]: argument})
             if self.arguments[i] in env.constants:
                 env.constants.remove(self.arguments[i])
         
-        rt = interpreter.evaluate(self.value, env, True, in_loop, False)
+        return env
+
+    def finish(self, rt, in_loop):
         if rt.error:
             return RuntimeResult(None, rt.error)
         
@@ -216,20 +1118,26 @@ def translate_fluentix_to_python(value):
             return False
         case "null":
             return None
-        case "string":
+        case "string" | "bytes":
             return value.value
         case "array":
-            new = []
-            for element in value.value:
-                new += [translate_fluentix_to_python(element)]
-            
-            return new
+            return value.to_python()
         case "defined function":
             return value
         case "native function":
             return value
+        case "matrix" | "sequence" | "record" | "record type" | "file":
+            return value
+        case "dictionary" | "set":
+            return value.value
 
 def translate_python_to_fluentix(value):
+    if isinstance(value, RuntimeValue):
+        return value
+    
+    if isinstance(value, BooleanKey):
+        return Boolean("true" if value.value else "false")
+    
     if isinstance(value, bool):
         if value:
             return Boolean("true")
@@ -245,14 +1153,23 @@ def translate_python_to_fluentix(value):
     if isinstance(value, str):
         return String(value)
     
-    if isinstance(value, (list, tuple, set)):
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return Bytes(value)
+
+    if isinstance(value, dict):
+        return Dictionary(value)
+    
+    if isinstance(value, set):
+        return Set(value)
+    
+    if isinstance(value, frozenset):
+        return Set(set(value))
+
+    if isinstance(value, (list, tuple)):
         new = []
         for element in value:
             new += [translate_python_to_fluentix(element)]
 
         return Array(new)
     
-    if isinstance(value, (DefinedFunction, NativeFunction)):
-        return value
-    
     return RuntimeResult(None, DataTypeError(f"Invalid data type in Python not translated to Fluentix: {type(value)}", 15))
\ No newline at end of file
@@ -0,0 +1,193 @@
+import operator
+from array import array
+from itertools import repeat
+from ..errors import RuntimeResult, MathError, ValueError
+import flu.runtime.values as v
+import flu.runtime.interpreter as interpreter
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+ARITHMETIC = {
+    "Plus": operator.add,
+    "Minus": operator.sub,
+    "Multiply": operator.mul,
+    "Divide": operator.truediv,
+    "Power": operator.pow
+}
+
+COMPARISON = {
+    "GreaterThan": operator.gt,
+    "GreaterThanOrEquals": operator.ge,
+    "SmallerThan": operator.lt,
+    "SmallerThanOrEquals": operator.le
+}
+
+# below this many elements, handing the work to NumPy costs more than it saves
+NUMPY_THRESHOLD = 4096
+# integer results that may not fit in an int64 are left to Python
+NUMPY_INT_LIMIT = 2 ** 62
+
+def is_vector_operation(left, right):
+    return left.type.type == "array" or right.type.type == "array"
+
+def numeric_operand(value):
+    # raw numbers behind a packed array or a number, None for anything else
+    if value.type.type == "number":
+        return value.value
+
+    if value.type.type == "array" and value.packed:
+        return value.storage()
+
+    return None
+
+def check_lengths(left, right):
+    if left.type.type == "array" and right.type.type == "array" and len(left) != len(right):
+        return RuntimeResult(None, ValueError(f"Expected arrays of the same length, got {len(left)} and {len(right)}", 99)) # unexpected
+
+    return RuntimeResult(None)
+
+def binary_operation(operator, left, right):
+    rt = check_lengths(left, right)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    x, y = numeric_operand(left), numeric_operand(right)
+    if x is None or y is None:
+        return elementwise(interpreter.binary_operation, operator, left, right)
+
+    if operator == "Divide" and (y == 0 if right.type.type == "number" else 0 in y):
+        return RuntimeResult(None, MathError("Cannot divide by 0", 1))
+
+    size = len(left) if left.type.type == "array" else len(right)
+    if numpy and size >= NUMPY_THRESHOLD:
+        result = numpy_operation(operator, x, y)
+        if result is not None:
+            return RuntimeResult(v.create_number_array(result))
+
+    try:
+        result = list(numbers_map(ARITHMETIC[operator], x, y))
+    except ZeroDivisionError:
+        return RuntimeResult(None, MathError("Cannot raise 0 to a negative power", 99)) # unexpected
+    except OverflowError:
+        return RuntimeResult(None, MathError("Result is too large", 99)) # unexpected
+
+    if operator == "Power" and any(isinstance(number, complex) for number in result):
+        return RuntimeResult(None, MathError("Cannot raise a negative number to a fractional power", 99)) # unexpected
+
+    return RuntimeResult(v.create_number_array(result))
+
+def comparison_operation(operator, left, right):
+    rt = check_lengths(left, right)
+    if rt.error:
+        return RuntimeResult(None, rt.error)
+
+    x, y = numeric_operand(left), numeric_operand(right)
+    if x is None or y is None:
+        return elementwise(interpreter.comparison_operation, operator, left, right)
+
+    # booleans are never changed in place, so every element can share the same two
+    booleans = (v.Boolean("false"), v.Boolean("true"))
+    size = len(left) if left.type.type == "array" else len(right)
+    if numpy and size >= NUMPY_THRESHOLD:
+        result = numpy_comparison(operator, x, y, booleans)
+        if result is not None:
+            return RuntimeResult(v.Array(result))
+
+    return RuntimeResult(v.Array(list(map(booleans.__getitem__, numbers_map(COMPARISON[operator], x, y)))))
+
+def numbers_map(function, x, y):
+    if not isinstance(x, (int, float)) and not isinstance(y, (int, float)):
+        return map(function, x, y)
+
+    if isinstance(x, (int, float)):
+        return map(function, repeat(x), y)
+
+    return map(function, x, repeat(y))
+
+def elementwise(operation, operator, left, right):
+    # boxed arrays (strings, nested arrays, ...) go through the scalar operations one pair at a time
+    if left.type.type == "array" and right.type.type == "array":
+        pairs = zip(left, right)
+    elif left.type.type == "array":
+        pairs = zip(left, repeat(right))
+    else:
+        pairs = zip(repeat(left), right)
+
+    result = []
+    for x, y in pairs:
+        rt = operation(operator, x, y)
+        if rt.error:
+            return RuntimeResult(None, rt.error)
+
+        result += [rt.result]
+
+    return RuntimeResult(v.Array(result))
+
+def as_numpy(operand):
+    if isinstance(operand, (int, float)):
+        return operand
+
+    return numpy.frombuffer(operand, dtype=numpy.int64 if operand.typecode == "q" else numpy.float64)
+
+def numpy_operation(operator, x, y):
+    integers = all(isinstance(operand, int) or getattr(operand, "typecode", "d") == "q" for operand in (x, y))
+    x, y = as_numpy(x), as_numpy(y)
+    if integers:
+        if operator == "Power":
+            return None
+
+        # int64 wraps around silently, so make sure the result cannot overflow first
+        bounds = [float(numpy.abs(operand.astype(numpy.float64)).max()) if isinstance(operand, numpy.ndarray) else abs(operand) for operand in (x, y)]
+        limit = bounds[0] * bounds[1] if operator == "Multiply" else bounds[0] + bounds[1]
+        if operator != "Divide" and limit >= NUMPY_INT_LIMIT:
+            return None
+
+    with numpy.errstate(all="ignore"):
+        result = ARITHMETIC[operator](x, y)
+
+    if operator == "Power" and not numpy.isfinite(result).all():
+        # Python reports overflows and negative bases with fractional powers, NumPy just returns inf or nan
+        return None
+
+    if result.dtype == numpy.int64:
+        return array("q", result.tobytes())
+
+    return array("d", result.astype(numpy.float64).tobytes())
+
+def numpy_comparison(operator, x, y, booleans):
+    if any(isinstance(operand, int) and abs(operand) >= NUMPY_INT_LIMIT for operand in (x, y)):
+        return None
+
+    integers = [isinstance(operand, int) or getattr(operand, "typecode", "d") == "q" for operand in (x, y)]
+    x, y = as_numpy(x), as_numpy(y)
+    if integers[0] != integers[1]:
+        # NumPy compares integers with floats as floats, which is only exact below 2 ** 53
+        operand = x if integers[0] else y
+        bound = abs(operand) if isinstance(operand, int) else max(abs(int(operand.min(initial=0))), abs(int(operand.max(initial=0))))
+        if bound >= 2 ** 53:
+            return None
+
+    flags = COMPARISON[operator](x, y)
+    return numpy.array(booleans, dtype=object)[flags.view(numpy.uint8)].tolist()
+
+def as_numpy_matrix(matrix):
+    # a strided view straight onto the matrix buffer, nothing is copied
+    return numpy.ndarray((matrix.rows, matrix.columns), numpy.float64, matrix.data, matrix.offset * 8, (matrix.strides[0] * 8, matrix.strides[1] * 8))
+
+def matrix_multiply(left, right):
+    if left.columns != right.rows:
+        return RuntimeResult(None, ValueError(f"Cannot multiply a {left.rows}x{left.columns} matrix by a {right.rows}x{right.columns} matrix", 99)) # unexpected
+
+    if numpy:
+        result = as_numpy_matrix(left) @ as_numpy_matrix(right)
+        return RuntimeResult(v.Matrix(left.rows, right.columns, array("d", result.tobytes())))
+
+    columns = right.transpose().to_rows()
+    data = array("d")
+    for row in left.to_rows():
+        data.extend([sum(map(operator.mul, row, column)) for column in columns])
+
+    return RuntimeResult(v.Matrix(left.rows, right.columns, data))